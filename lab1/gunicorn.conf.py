@@ -0,0 +1,50 @@
+# Production server configuration: gunicorn -c gunicorn.conf.py main:app
+#
+# Pre-forked workers each run a thread pool sized to their MySQL pool, so a
+# request thread never has to queue for a connection in its own process.
+import os
+import sys
+import time
+
+from store.db.connection import close_pool, start_pool_warmup, configured_pool_size
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", configured_pool_size()))
+# Load the app once in the master; workers share its imported code copy-on-write
+preload_app = True
+timeout = int(os.environ.get("WEB_TIMEOUT", 60))
+# Cloud Run sends SIGKILL 10 s after SIGTERM; draining requests and
+# worker_exit below must both finish inside that
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 8))
+# Total budget of worker_exit, shared by all of its steps
+shutdown_timeout = float(os.environ.get("WEB_SHUTDOWN_TIMEOUT", 5))
+keepalive = int(os.environ.get("WEB_KEEPALIVE", 5))
+accesslog = "-" if os.environ.get("WEB_ACCESS_LOG", "0") == "1" else None
+errorlog = "-"
+
+if threads > configured_pool_size():
+    print(f"WEB_THREADS={threads} exceeds DB_POOL_SIZE={configured_pool_size()}; "
+          f"extra threads will wait on pool checkout", file=sys.stderr)
+
+
+def post_fork(server, worker):
+    # Pools must never be shared across a fork: each worker opens its own,
+    # in the background so the worker starts accepting requests right away
+    start_pool_warmup()
+
+
+def worker_exit(server, worker):
+    deadline = time.monotonic() + shutdown_timeout
+
+    def remaining():
+        return max(0.0, deadline - time.monotonic())
+
+    # Commit buffered reviews first: they are the only writes clients are waiting on
+    from store.controller.review import review_buffer
+    review_buffer.close(timeout=remaining())
+    # Queued jobs are cancelled; a running procedure gets whatever time is left
+    from store.service.jobs import get_job_runner
+    get_job_runner().shutdown(timeout=remaining())
+    close_pool(timeout=remaining())
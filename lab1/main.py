@@ -1,10 +1,17 @@
+import logging
 import os
 from flask import Flask, jsonify
 from store.route import init_routes
-from store.db.connection import db_connection
+from store.db.connection import pool_warmup_status, start_pool_warmup
 from flask import request
 from store.decorators.auth import require_auth
 from flask_swagger_ui import get_swaggerui_blueprint
+
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s',
+)
+
 app = Flask(__name__)
 
 
@@ -25,6 +32,16 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.route('/_ready', methods=['GET'])
+def readiness_check():
+    """Ready once this process's database pool is warm"""
+    warmup = pool_warmup_status()
+    if warmup['state'] == 'idle':
+        # Nothing started a warm-up (e.g. a plain WSGI server): begin one now
+        start_pool_warmup()
+    return jsonify(warmup), 200 if warmup['state'] == 'ready' else 503
+
+
 init_routes(app)
 
 
@@ -45,5 +62,10 @@ init_routes(app)
 
 
 if __name__ == '__main__':
+    # Development server only; production runs gunicorn -c gunicorn.conf.py main:app
     port = int(os.environ.get('PORT', 8080))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    debug = os.environ.get('FLASK_DEBUG', '1') == '1'
+    # With the reloader on, only the child process serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_pool_warmup()
+    app.run(host="0.0.0.0", port=port, debug=debug)
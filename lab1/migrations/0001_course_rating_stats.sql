@@ -0,0 +1,75 @@
+-- Per-course rating aggregates served by GET /statistics/ratings.
+--
+-- Triggers on `reviews` keep them exact however a review is written
+-- (InsertIntoReviews, the review buffer, or by hand). Run once, as a user
+-- with CREATE and TRIGGER privileges; the app user needs neither:
+--
+--   mysql -h "$DB_HOST" -P "$DB_PORT" -u <admin> -p "$DB_NAME" < migrations/0001_course_rating_stats.sql
+--
+-- Re-running is safe: triggers are replaced and the backfill overwrites.
+
+CREATE TABLE IF NOT EXISTS course_rating_stats (
+    course_id INT NOT NULL PRIMARY KEY,
+    review_count BIGINT NOT NULL,
+    rating_sum BIGINT NOT NULL,
+    rating_min INT NOT NULL,
+    rating_max INT NOT NULL
+);
+
+DROP TRIGGER IF EXISTS reviews_rating_stats_insert;
+DROP TRIGGER IF EXISTS reviews_rating_stats_update;
+DROP TRIGGER IF EXISTS reviews_rating_stats_delete;
+
+DELIMITER //
+
+CREATE TRIGGER reviews_rating_stats_insert AFTER INSERT ON reviews
+FOR EACH ROW
+BEGIN
+    IF NEW.rating IS NOT NULL THEN
+        INSERT INTO course_rating_stats (course_id, review_count, rating_sum, rating_min, rating_max)
+        VALUES (NEW.course_id, 1, NEW.rating, NEW.rating, NEW.rating)
+        ON DUPLICATE KEY UPDATE
+            review_count = review_count + 1,
+            rating_sum = rating_sum + VALUES(rating_sum),
+            rating_min = LEAST(rating_min, VALUES(rating_min)),
+            rating_max = GREATEST(rating_max, VALUES(rating_max));
+    END IF;
+END//
+
+-- MIN/MAX cannot be decremented, so updates and deletes recount the course
+
+CREATE TRIGGER reviews_rating_stats_update AFTER UPDATE ON reviews
+FOR EACH ROW
+BEGIN
+    DELETE FROM course_rating_stats WHERE course_id IN (OLD.course_id, NEW.course_id);
+    INSERT INTO course_rating_stats (course_id, review_count, rating_sum, rating_min, rating_max)
+    SELECT course_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+    FROM reviews
+    WHERE course_id IN (OLD.course_id, NEW.course_id) AND rating IS NOT NULL
+    GROUP BY course_id;
+END//
+
+CREATE TRIGGER reviews_rating_stats_delete AFTER DELETE ON reviews
+FOR EACH ROW
+BEGIN
+    DELETE FROM course_rating_stats WHERE course_id = OLD.course_id;
+    INSERT INTO course_rating_stats (course_id, review_count, rating_sum, rating_min, rating_max)
+    SELECT course_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+    FROM reviews
+    WHERE course_id = OLD.course_id AND rating IS NOT NULL
+    GROUP BY course_id;
+END//
+
+DELIMITER ;
+
+-- Backfill after the triggers exist, so no review falls between the two
+INSERT INTO course_rating_stats (course_id, review_count, rating_sum, rating_min, rating_max)
+SELECT course_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+FROM reviews
+WHERE rating IS NOT NULL
+GROUP BY course_id
+ON DUPLICATE KEY UPDATE
+    review_count = VALUES(review_count),
+    rating_sum = VALUES(rating_sum),
+    rating_min = VALUES(rating_min),
+    rating_max = VALUES(rating_max);
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+from flask import Blueprint, g, jsonify, request
+
+from store.db.connection import configured_pool_size
+from store.metrics import REGISTRY
+
+admission_bp = Blueprint('admission', __name__)
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued for a slot", ("budget",))
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected_total", "Requests shed with 503 because a budget's queue was full", ("budget", "reason"))
+
+
+class AdmissionLimiter:
+    """At most `limit` requests inside, `queue` more waiting up to `max_wait` seconds.
+
+    Anything beyond that is turned away immediately, so a burst costs the
+    rejected clients one fast 503 instead of costing everyone latency.
+    """
+
+    def __init__(self, name, limit, queue, max_wait):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Return None once admitted, or the reason ('queue_full'/'timeout') it was not."""
+        started = time.perf_counter()
+        with self._cond:
+            if self.active >= self.limit:
+                if self.waiting >= self.queue:
+                    self.rejected += 1
+                    return 'queue_full'
+                self.waiting += 1
+                deadline = time.monotonic() + self.max_wait
+                try:
+                    while self.active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            return 'timeout'
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, self.name)
+        return None
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'queue': self.queue,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+            }
+
+
+def _parse_limits(spec):
+    """'user=8:16,heavy=2:2' -> {'user': (8, 16), 'heavy': (2, 2)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, values = item.partition('=')
+        limit, _, queue = values.partition(':')
+        limits[name.strip()] = (int(limit), int(queue or 0))
+    return limits
+
+
+# Opt-in: with it off every request goes straight to its view as before
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', '0') in ('1', 'true')
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT_MS', 250)) / 1000
+ADMISSION_RETRY_AFTER = os.environ.get('ADMISSION_RETRY_AFTER', '1')
+# Endpoints that share the 'heavy' budget instead of their blueprint's
+HEAVY_ENDPOINTS = frozenset(filter(None, os.environ.get(
+    'ADMISSION_HEAVY', 'user.get_all_users_with_courses,table.distribute_data').split(',')))
+# Blueprints that are never limited: scrapes must work best under overload
+EXEMPT_BLUEPRINTS = frozenset(('metrics', 'admission', 'consistency'))
+
+# Budgets are per blueprint ('*' is the default for any blueprint not listed);
+# every budget defaults to the pool size, the heavy one to half of it
+_pool_size = configured_pool_size()
+_limits = {'*': (_pool_size, _pool_size), 'heavy': (max(1, _pool_size // 2), 2)}
+_limits.update(_parse_limits(os.environ.get('ADMISSION_LIMITS', '')))
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter(budget):
+    limiter = _limiters.get(budget)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(budget)
+            if limiter is None:
+                limit, queue = _limits.get(budget, _limits['*'])
+                limiter = _limiters[budget] = AdmissionLimiter(budget, limit, queue, ADMISSION_MAX_WAIT)
+    return limiter
+
+
+def admission_stats():
+    """Flat per-budget counters, e.g. user_active, heavy_rejected."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {f"{limiter.name}_{key}": value for limiter in limiters for key, value in limiter.stats().items()}
+
+
+REGISTRY.register_collector('admission', admission_stats, 'Admission control budgets')
+
+
+@admission_bp.before_app_request
+def _admit():
+    if not ADMISSION_ENABLED or request.blueprint in (None, *EXEMPT_BLUEPRINTS):
+        return None
+    budget = 'heavy' if request.endpoint in HEAVY_ENDPOINTS else request.blueprint
+    limiter = _limiter(budget)
+    reason = limiter.acquire()
+    if reason is not None:
+        ADMISSION_REJECTED.inc(budget, reason)
+        return jsonify({'error': f"Server busy ({budget}), retry later"}), 503, {'Retry-After': ADMISSION_RETRY_AFTER}
+    g.admission_limiter = limiter
+    return None
+
+
+@admission_bp.teardown_app_request
+def _release(exc):
+    # Like the request timer, this runs after a streamed body's last chunk,
+    # so a slot stays taken for as long as the response holds a connection
+    limiter = g.pop('admission_limiter', None)
+    if limiter is not None:
+        limiter.release()
@@ -0,0 +1,36 @@
+import math
+import time
+
+from flask import Blueprint, request
+
+from store.db.connection import get_replicas, primary_until, read_your_writes_window, stick_to_primary
+
+consistency_bp = Blueprint('consistency', __name__)
+
+# Carries read-your-writes across requests: after a write, this client's
+# reads stay on the primary until the replicas have had time to catch up
+STICKY_COOKIE = 'db_primary_until'
+
+
+@consistency_bp.before_app_request
+def _restore_stickiness():
+    # Worker threads are reused, so every request starts from its own cookie
+    until = 0.0
+    if get_replicas():
+        try:
+            until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pass
+        # Never trust a client-supplied deadline beyond one window
+        until = min(until, time.time() + read_your_writes_window())
+    stick_to_primary(until)
+
+
+@consistency_bp.after_app_request
+def _persist_stickiness(response):
+    until = primary_until()
+    remaining = until - time.time()
+    if remaining > 0 and get_replicas():
+        response.set_cookie(
+            STICKY_COOKIE, f'{until:.3f}', max_age=math.ceil(remaining), httponly=True, samesite='Lax')
+    return response
@@ -1,18 +1,21 @@
 from flask import Blueprint, jsonify, request
-from store.service.enrollment_service import EnrollmentService
+from store.service.enrollment_service import EnrollmentService, ImportInterrupted
 from store.dao.enrollment_dao import EnrollmentDAO
-from store.db.connection import db_connection as db
+from store.controller.payload import read_records, iter_records, chunk_size_arg, bulk_response
+from store.controller.response import conditional, json_response
+from store.db.connection import PoolTimeoutError
 
 enrollment_bp = Blueprint('enrollment', __name__)
 
 
-enrollment_dao = EnrollmentDAO(db)
+enrollment_dao = EnrollmentDAO()
 enrollment_service = EnrollmentService(enrollment_dao)  
 
 @enrollment_bp.route('/enrollments', methods=['GET'])
+@conditional('enrollments', 'users', 'courses')
 def get_enrollments():
     enrollments = enrollment_service.get_all_enrollments()
-    return jsonify(enrollments), 200
+    return json_response(enrollments, presorted=True)
 
 @enrollment_bp.route('/enrollments', methods=['POST'])
 def add_enrollment():
@@ -24,6 +27,58 @@ def add_enrollment():
     enrollment_service.add_enrollment(user_id, course_id, completion_status)
     return jsonify({'message': 'Enrollment added successfully!'}), 201
 
+@enrollment_bp.route('/enrollments/bulk', methods=['POST'])
+def add_enrollments_bulk():
+    """Insert many enrollments from a JSON array or NDJSON body in one transaction."""
+    try:
+        records, errors = read_records()
+        chunk_size = chunk_size_arg()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        inserted, failed = enrollment_service.add_enrollments(records, chunk_size=chunk_size)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    body, status = bulk_response(inserted, errors + failed)
+    return jsonify(body), status
+
+@enrollment_bp.route('/enrollments/import', methods=['POST'])
+def import_enrollments():
+    """Import enrollments by user name and course title from CSV or NDJSON, chunk by chunk.
+
+    Each chunk commits on its own. If the import stops part way, the error
+    response still carries the summary of the committed chunks and
+    `last_committed_index`; re-posting the same body with
+    ``?after=<last_committed_index>`` resumes without inserting them twice.
+    """
+    try:
+        chunk_size = chunk_size_arg()
+        after = request.args.get('after')
+        if after is not None:
+            if not after.lstrip('-').isdigit():
+                raise ValueError('after must be an integer record index')
+            after = int(after)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        inserted, errors, unknown_users, unknown_courses = enrollment_service.import_by_names(
+            iter_records(), chunk_size=chunk_size, after=after)
+    except ImportInterrupted as e:
+        body, _ = bulk_response(e.inserted, e.errors)
+        body['error'] = str(e)
+        body['last_committed_index'] = e.last_index
+        body['unknown_courses'] = e.unknown_courses
+        body['unknown_users'] = e.unknown_users
+        if isinstance(e.__cause__, ValueError):
+            return jsonify(body), 400
+        return jsonify(body), 503 if isinstance(e.__cause__, PoolTimeoutError) else 500
+    body, status = bulk_response(inserted, errors)
+    body['unknown_courses'] = unknown_courses
+    body['unknown_users'] = unknown_users
+    return jsonify(body), status
+
 @enrollment_bp.route('/enrollments/<int:enrollment_id>', methods=['DELETE'])
 def delete_enrollment(enrollment_id):
     enrollment_service.delete_enrollment(enrollment_id)
@@ -0,0 +1,55 @@
+from flask import Blueprint, jsonify, request, url_for
+
+from store.controller.response import json_response
+from store.metrics import REGISTRY
+from store.service.jobs import JobQueueFullError, get_job_runner
+
+jobs_bp = Blueprint('jobs', __name__)
+
+job_runner = get_job_runner()
+REGISTRY.register_collector('jobs', job_runner.stats, 'Background jobs')
+
+
+def start_job(kind, fn, *args, params=None, success=None):
+    """Submit a job and answer 202 with a Location to poll.
+
+    With ``?wait=1`` the request waits for the job and answers the way the
+    old synchronous endpoint did: 201 with `success`, or 500.
+    """
+    try:
+        job = job_runner.submit(kind, fn, *args, params=params)
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+
+    if request.args.get('wait', '0') in ('1', 'true'):
+        job.wait()
+        if job.status == 'succeeded':
+            return jsonify({'message': success, 'job': job.to_dict()}), 201
+        return jsonify({'error': job.error or job.status, 'job': job.to_dict()}), 500
+
+    location = url_for('jobs.get_job', job_id=job.id)
+    return jsonify({'job': job.to_dict()}), 202, {'Location': location}
+
+
+@jobs_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Jobs known to this process, newest first."""
+    jobs = [job.to_dict() for job in reversed(job_runner.list())]
+    return json_response(jobs)
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return json_response(job.to_dict())
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Ask a job to stop; it ends as 'cancelled' at its next checkpoint."""
+    job = job_runner.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return json_response(job.to_dict(), 202)
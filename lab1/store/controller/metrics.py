@@ -0,0 +1,44 @@
+import time
+
+from flask import Blueprint, Response, g, request
+
+from store.metrics import CONTENT_TYPE, REGISTRY
+
+metrics_bp = Blueprint('metrics', __name__)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency, including streamed bodies",
+    ("method", "route", "status"))
+IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests currently being served")
+
+
+@metrics_bp.before_app_request
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+    IN_FLIGHT.inc()
+
+
+@metrics_bp.after_app_request
+def _record_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+@metrics_bp.teardown_app_request
+def _observe(exc):
+    # Runs when the request context is popped, which for stream_with_context
+    # responses is after the last chunk, so streams are timed in full
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    # The route template, not the path, keeps label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = str(g.pop('metrics_status', 500))
+    REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route, status)
+    IN_FLIGHT.dec()
+
+
+@metrics_bp.route('/_metrics', methods=['GET'])
+def metrics():
+    """Process metrics in the Prometheus text exposition format."""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
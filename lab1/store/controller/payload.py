@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+
+from flask import request
+
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 500))
+BULK_MAX_CHUNK_SIZE = 5000
+
+
+def read_records():
+    """Read a bulk request body as a JSON array or NDJSON (one object per line).
+
+    Returns ``(records, errors)``: records are ``(index, value)`` pairs and
+    errors are ``(index, message)`` for NDJSON lines that are not valid JSON.
+    Raises ValueError when the body is neither form.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        records, errors = [], []
+        lines = (line for line in request.get_data(as_text=True).splitlines() if line.strip())
+        for index, line in enumerate(lines):
+            try:
+                records.append((index, json.loads(line)))
+            except ValueError as e:
+                errors.append((index, f'Invalid JSON: {e}'))
+        return records, errors
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Body must be a JSON array or NDJSON')
+    return list(enumerate(data)), []
+
+
+def iter_records():
+    """Stream a bulk request body record by record.
+
+    CSV (``text/csv``, header row first) and NDJSON are parsed line by line
+    as the body is read, so a large import never sits in memory whole; a
+    JSON array is parsed at once. Yields ``(index, record, error)`` where
+    `error` is a message for a line that could not be parsed.
+    """
+    if request.mimetype == 'text/csv':
+        lines = (
+            line.decode('utf-8-sig' if number == 0 else 'utf-8', errors='replace')
+            for number, line in enumerate(request.stream)
+        )
+        reader = csv.DictReader(lines)
+        index = 0
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield index, None, f'Invalid CSV: {e}'
+            else:
+                yield index, {key: value.strip() if isinstance(value, str) else value
+                              for key, value in row.items() if key is not None}, None
+            index += 1
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        index = 0
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line), None
+            except ValueError as e:
+                yield index, None, f'Invalid JSON: {e}'
+            index += 1
+        return
+
+    records, _ = read_records()
+    for index, record in records:
+        yield index, record, None
+
+
+def chunk_size_arg():
+    chunk_size = int(request.args.get('chunk_size', BULK_CHUNK_SIZE))
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be >= 1')
+    return min(chunk_size, BULK_MAX_CHUNK_SIZE)
+
+
+def bulk_response(inserted, errors):
+    """Summary body and status: 201 all rows in, 207 partial, 400 none."""
+    errors = sorted(errors)
+    body = {
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': [{'index': index, 'error': message} for index, message in errors],
+    }
+    if not errors:
+        return body, 201
+    return body, 207 if inserted else 400
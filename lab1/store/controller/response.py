@@ -0,0 +1,95 @@
+import functools
+
+from flask import Response, current_app, jsonify, make_response, request, stream_with_context
+
+from store.dao.versions import table_versions
+
+_encoders = {}
+
+
+def _encoder(presorted):
+    """Reusable encoder matching what flask.jsonify would configure for this request.
+
+    With `presorted` the caller guarantees every dict was built with its keys
+    in sorted order, so the per-object key sort can be skipped and the bytes
+    still match jsonify's sort_keys output. Only RowMapper output carries
+    that guarantee; hand-built dicts must leave `presorted` off.
+    """
+    app = current_app
+    cls = app.json_encoder
+    blueprint = app.blueprints.get(request.blueprint) if request else None
+    if blueprint is not None and blueprint.json_encoder is not None:
+        cls = blueprint.json_encoder
+    ensure_ascii = app.config["JSON_AS_ASCII"]
+    sort_keys = app.config["JSON_SORT_KEYS"] and not presorted
+
+    key = (cls, ensure_ascii, sort_keys)
+    encoder = _encoders.get(key)
+    if encoder is None:
+        encoder = _encoders[key] = cls(
+            ensure_ascii=ensure_ascii,
+            sort_keys=sort_keys,
+            separators=(",", ":"),
+            check_circular=False,
+        )
+    return encoder
+
+
+def _pretty():
+    return current_app.config["JSONIFY_PRETTYPRINT_REGULAR"] or current_app.debug
+
+
+def json_response(data, status=200, presorted=False):
+    """Byte-for-byte equivalent of ``jsonify(data), status`` with less work per call.
+
+    Always returns a Response, so callers can set headers on it.
+    """
+    if _pretty():
+        # Indented output is for humans; leave it to Flask
+        response = jsonify(data)
+        response.status_code = status
+        return response
+    return current_app.response_class(
+        f"{_encoder(presorted).encode(data)}\n",
+        status=status,
+        mimetype=current_app.config["JSONIFY_MIMETYPE"],
+    )
+
+
+def stream_json_array(items, presorted=False):
+    """Write a JSON array item by item instead of materialising it first."""
+    encode = _encoder(presorted).encode
+
+    def generate():
+        yield '['
+        for index, item in enumerate(items):
+            if index:
+                yield ','
+            yield encode(item)
+        yield ']\n'
+    return Response(stream_with_context(generate()), mimetype=current_app.config["JSONIFY_MIMETYPE"])
+
+
+def conditional(*tables):
+    """Tag a GET view with an ETag built from the versions of `tables`.
+
+    A matching If-None-Match is answered with 304 before the view runs, so
+    polling clients cost neither a query nor a serialization pass.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Taken before the view queries, so a concurrent write always changes the tag
+            etag = table_versions.etag(*tables)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # Clients and proxies may keep the body but must revalidate each time
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
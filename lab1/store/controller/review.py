@@ -1,10 +1,25 @@
+import os
+import time
+from concurrent.futures import TimeoutError
+
 from flask import Blueprint, request, jsonify
 from store.dao.review import ReviewDAO
-from store.db.connection import db_connection as db
+from store.dto.review import ReviewDTO
+from store.service.review_buffer import BufferClosedError, BufferFullError, ReviewWriteBuffer
+from store.metrics import REGISTRY
+from store.db.connection import read_your_writes_window, stick_to_primary
 review_bp = Blueprint('review', __name__)
 
 
-review_dao = ReviewDAO(db)
+review_dao = ReviewDAO()
+# Optional group-commit path, enabled with REVIEW_BUFFER_ENABLED=1
+review_buffer = ReviewWriteBuffer.from_env(review_dao)
+REGISTRY.register_collector('review_buffer', review_buffer.stats, 'Review write buffer')
+# 'commit' (default): answer once the review's batch commits, so a review that
+# InsertIntoReviews rejects reaches the client. 'enqueue': answer 202 as soon as it
+# is queued; a later rejection is only counted in the buffer stats. ?wait=0/1 overrides.
+REVIEW_BUFFER_ACK = os.environ.get('REVIEW_BUFFER_ACK', 'commit')
+REVIEW_COMMIT_TIMEOUT = float(os.environ.get('REVIEW_COMMIT_TIMEOUT', 10))
 
 @review_bp.route('/reviews', methods=['POST'])
 def insert_review():
@@ -20,8 +35,48 @@ def insert_review():
     rating = data['rating']
     comment = data['comment']
 
+    if review_buffer.enabled:
+        return _buffered_insert(ReviewDTO(course_id, user_id, rating, comment))
+
     try:
         review_dao.call_insert_review_procedure(course_id, user_id, rating, comment)
         return jsonify({'message': 'Review inserted successfully!'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+def _buffered_insert(review):
+    # Bad types would only fail inside a batch; answer them without taking a queue slot
+    if not all(isinstance(value, int) and not isinstance(value, bool)
+               for value in (review.course_id, review.user_id, review.rating)):
+        return jsonify({'error': 'course_id, user_id and rating must be integers'}), 400
+
+    try:
+        future = review_buffer.submit(review)
+    except (BufferFullError, BufferClosedError) as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+    # The flusher commits on its own thread, so make this client's next reads sticky here
+    stick_to_primary(time.time() + read_your_writes_window())
+
+    wait = request.args.get('wait', '0' if REVIEW_BUFFER_ACK == 'enqueue' else '1') in ('1', 'true')
+    if not wait:
+        return jsonify({'message': 'Review accepted; it is not committed yet and may still be rejected'}), 202
+
+    try:
+        future.result(timeout=REVIEW_COMMIT_TIMEOUT)
+        return jsonify({'message': 'Review inserted successfully!'}), 201
+    except TimeoutError:
+        # Withdraw it if its batch has not started; otherwise it may still commit
+        if future.cancel():
+            return jsonify({'error': f'Review not committed within {REVIEW_COMMIT_TIMEOUT:g}s; '
+                                     f'it was withdrawn and will not be saved'}), 504
+        return jsonify({'error': f'Review not confirmed within {REVIEW_COMMIT_TIMEOUT:g}s; '
+                                 f'it may still be committed, check before retrying'}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@review_bp.route('/reviews/buffer', methods=['GET'])
+def review_buffer_stats():
+    """Queue depth, batch and flush latency counters of the review write buffer."""
+    return jsonify(review_buffer.stats()), 200
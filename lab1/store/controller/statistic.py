@@ -3,12 +3,12 @@
 from flask import Blueprint, jsonify, request
 from store.dao.statistic import StatisticDAO
 from store.service.statistic import StatisticService
-from store.db.connection import db_connection as db
+from store.controller.response import json_response
 
 statistic_bp = Blueprint('statistic', __name__)
 
 
-statistic_dao = StatisticDAO(db)
+statistic_dao = StatisticDAO()
 statistic_service = StatisticService(statistic_dao)
 
 @statistic_bp.route('/statistics', methods=['GET'])
@@ -21,6 +21,32 @@ def get_statistic():
     try:
         # Виклик сервісу для отримання статистики
         result = statistic_service.get_statistic(stat_type)
-        return jsonify({'StatisticResult': result[0][0]}), 200
+        return json_response({'StatisticResult': result[0][0]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@statistic_bp.route('/statistics/ratings', methods=['GET'])
+def get_rating_statistics():
+    """MAX/MIN/SUM/AVG/COUNT of review ratings, overall or for `?course_id=`."""
+    course_id = request.args.get('course_id')
+    if course_id is not None:
+        try:
+            course_id = int(course_id)
+        except ValueError:
+            return jsonify({'error': 'course_id must be an integer'}), 400
+
+    try:
+        return json_response(statistic_service.get_rating_statistics(course_id))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@statistic_bp.route('/statistics/ratings/rebuild', methods=['POST'])
+def rebuild_rating_statistics():
+    """Recompute the rating aggregates from the reviews table."""
+    try:
+        statistic_service.rebuild_rating_statistics()
+        return jsonify({'message': 'Rating statistics rebuilt successfully!'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,18 +1,23 @@
 # controllers/table_controller.py
 
 from flask import Blueprint, request, jsonify
-from store.dao.table_dao import TableDAO
+from store.dao.table_dao import TableDAO, validate_table_names
 from store.service.table import TableService
-from store.db.connection import db_connection as db
+from store.controller.jobs import start_job
 
 table_bp = Blueprint('table', __name__)
 
 
-table_dao = TableDAO(db)
+table_dao = TableDAO()
 table_service = TableService(table_dao)
 
 @table_bp.route('/tables/distribute', methods=['POST'])
 def distribute_data():
+    """Розподіл даних у фоновій задачі; статус — GET /jobs/<id>.
+
+    CreateAndDistributeData still runs as one transaction: its split rule is
+    not in this repository, so there is no chunked equivalent to offer.
+    """
     data = request.get_json()
 
     if not all(key in data for key in ('parent_table', 'new_table1', 'new_table2')):
@@ -23,8 +28,15 @@ def distribute_data():
     new_table2 = data['new_table2']
 
     try:
-        # Виклик сервісу
-        table_service.create_and_distribute_data(parent_table, new_table1, new_table2)
-        return jsonify({'message': 'Data distributed successfully!'}), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        validate_table_names(parent_table, new_table1, new_table2)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    params = {'parent_table': parent_table, 'new_table1': new_table1, 'new_table2': new_table2}
+    return start_job('tables.distribute', _run_procedure, parent_table, new_table1, new_table2,
+                     params=params, success='Data distributed successfully!')
+
+
+def _run_procedure(job, parent_table, new_table1, new_table2):
+    # One opaque call: it can only be cancelled before it starts
+    table_service.create_and_distribute_data(parent_table, new_table1, new_table2)
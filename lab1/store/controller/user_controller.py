@@ -4,6 +4,10 @@ from store.dao.user_dao import UserDAO
 from store.dto.user_dto import UserDTO, CourseDTO, ProgressDTO
 from store.service.user_service import UserService
 from store.service.auth import AuthService
+from store.controller.payload import read_records, chunk_size_arg, bulk_response
+from store.controller.jobs import start_job
+from store.metrics import REGISTRY
+from store.controller.response import conditional, json_response, stream_json_array
 
 
 user_bp = Blueprint('user', __name__)
@@ -12,14 +16,50 @@ user_bp = Blueprint('user', __name__)
 # Initialize the User DAO and Service
 user_dao = UserDAO()
 user_service = UserService(user_dao)
+REGISTRY.register_collector('user_cache', user_service.cache.stats, 'User lookup cache')
 
 
 
+USERS_PAGE_MAX_LIMIT = 1000
+USERS_STREAM_BATCH_SIZE = 500
+
+
+def _optional_int_arg(name, minimum):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    value = int(value)
+    if value < minimum:
+        raise ValueError(f'{name} must be >= {minimum}')
+    return value
+
+
 @user_bp.route('/users', methods=['GET'])
+@conditional('users')
 def get_users():
-    users = user_service.get_all_users()
-    user_dtos = [UserDTO(user[0], user[1], user[2]).to_dict() for user in users]    
-    return jsonify(user_dtos), 200
+    """List users; `limit`/`after` page by id, `stream=1` streams the rows."""
+    try:
+        limit = _optional_int_arg('limit', 1)
+        after = _optional_int_arg('after', 0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.args.get('stream') in ('1', 'true'):
+        users = user_service.iter_users(after=after, batch_size=USERS_STREAM_BATCH_SIZE, limit=limit)
+        return stream_json_array(UserDTO.ROW.iter(users), presorted=True)
+
+    if limit is None and after is None:
+        users = user_service.get_all_users()
+        return json_response(UserDTO.ROW.many(users), presorted=True)
+
+    limit = min(limit or USERS_PAGE_MAX_LIMIT, USERS_PAGE_MAX_LIMIT)
+    users = user_service.get_users_page(after=after, limit=limit)
+    response = json_response(UserDTO.ROW.many(users), presorted=True)
+    if len(users) == limit:
+        next_after = users[-1][0]
+        response.headers['X-Next-After'] = str(next_after)
+        response.headers['Link'] = f'<{request.path}?after={next_after}&limit={limit}>; rel="next"'
+    return response
 
 @user_bp.route('/signup', methods=['POST'])
 def create_user(request=request):
@@ -39,10 +79,45 @@ def login_user(request=request):
 def get_user_by_id(user_id):
     user = user_service.get_user_by_id(user_id)
     if user:
-        user_dto = UserDTO(user[0], user[1], user[2]).to_dict()
-        return jsonify(user_dto), 200
+        return json_response(UserDTO.ROW.one(user), presorted=True)
     return jsonify({'message': 'User not found'}), 404
 
+@user_bp.route('/users/bulk', methods=['POST'])
+def create_users_bulk():
+    """Insert many users from a JSON array or NDJSON body in one transaction."""
+    try:
+        records, errors = read_records()
+        chunk_size = chunk_size_arg()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        inserted, failed = user_service.insert_users(records, chunk_size=chunk_size)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    body, status = bulk_response(inserted, errors + failed)
+    return jsonify(body), status
+
+@user_bp.route('/users/batch', methods=['GET', 'POST'])
+def get_users_batch():
+    """Look up many users at once: `?ids=1,2,3` or a JSON body `{"ids": [...]}`."""
+    try:
+        if request.method == 'POST':
+            ids = (request.get_json(silent=True) or {}).get('ids')
+            if not isinstance(ids, list):
+                raise ValueError('ids must be a list of integers')
+        else:
+            ids = [part for part in request.args.get('ids', '').split(',') if part.strip()]
+        user_ids = [int(user_id) for user_id in ids]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'ids must be a list of integers'}), 400
+
+    users, missing = user_service.get_users_by_ids(user_ids)
+    return json_response({
+        'missing': missing,
+        'users': UserDTO.ROW.many(users),
+    })
+
 @user_bp.route('/users/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
     data = request.json
@@ -59,31 +134,61 @@ def update_user(user_id):
 #     return jsonify(response), status_code
 
 @user_bp.route('/users/<int:user_id>/courses', methods=['GET'])
+@conditional('enrollments', 'courses')
 def get_user_courses(user_id):
     courses = user_service.get_user_courses(user_id)
-    course_dtos = [CourseDTO(course[0], course[1], course[2]).to_dict() for course in courses]
-    return jsonify(course_dtos), 200
+    return json_response(CourseDTO.ROW.many(courses), presorted=True)
 
 @user_bp.route('/users/courses', methods=['GET'])
+@conditional('users', 'enrollments', 'courses')
 def get_all_users_with_courses():
-    users_with_courses = user_service.get_all_users_with_courses()
-    return jsonify(users_with_courses), 200
+    """Users with courses; `limit`/`after` page by user id, `stream=1` streams."""
+    try:
+        limit = _optional_int_arg('limit', 1)
+        after = _optional_int_arg('after', 0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.args.get('stream') in ('1', 'true'):
+        return stream_json_array(user_service.iter_users_with_courses(after=after, limit=limit))
+
+    if limit is None and after is None:
+        users_with_courses = user_service.get_all_users_with_courses()
+        return json_response(users_with_courses)
+
+    limit = min(limit or USERS_PAGE_MAX_LIMIT, USERS_PAGE_MAX_LIMIT)
+    users_with_courses = list(user_service.iter_users_with_courses(after=after, limit=limit))
+    response = json_response(users_with_courses)
+    if len(users_with_courses) == limit:
+        next_after = users_with_courses[-1]['id']
+        response.headers['X-Next-After'] = str(next_after)
+        response.headers['Link'] = f'<{request.path}?after={next_after}&limit={limit}>; rel="next"'
+    return response
 
 @user_bp.route('/users/<int:user_id>/progress', methods=['GET'])
 def get_user_progress(user_id):
     progress = user_service.get_user_progress(user_id)
-    progress_dtos = [ProgressDTO(module[0], module[1]).to_dict() for module in progress]
-    return jsonify(progress_dtos), 200
+    return json_response(ProgressDTO.ROW.many(progress), presorted=True)
+
+
+@user_bp.route('/users/<int:user_id>/dashboard', methods=['GET'])
+def get_user_dashboard(user_id):
+    """User, enrolled courses with completed/total module counts, and module progress."""
+    dashboard = user_service.get_user_dashboard(user_id)
+    if dashboard is None:
+        return jsonify({'message': 'User not found'}), 404
+    return json_response(dashboard)
 
 
 @user_bp.route('/users/noname', methods=['POST'])
 def insert_noname_users():
-    """Виклик процедури InsertNonameRecords"""
-    try:
-        user_service.insert_noname_records()
-        return jsonify({'message': 'Noname records inserted successfully!'}), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    """Виклик процедури InsertNonameRecords у фоновій задачі; статус — GET /jobs/<id>"""
+    return start_job('users.noname', _run_noname, success='Noname records inserted successfully!')
+
+
+def _run_noname(job):
+    # One opaque call: it can only be cancelled before it starts
+    user_service.insert_noname_records()
 
 
 
@@ -0,0 +1,36 @@
+from mysql.connector import errors
+
+# Errors caused by the data in a row, as opposed to the connection or the SQL
+ROW_ERRORS = (errors.IntegrityError, errors.DataError)
+
+
+def insert_rows(cur, sql, rows, chunk_size=500):
+    """Insert `rows` (a list of ``(index, params)``) in multi-row chunks.
+
+    Runs inside the caller's transaction. Each chunk goes out as one
+    executemany (a single multi-row INSERT); if a chunk is rejected it is
+    rolled back to a savepoint and retried row by row, so one bad row only
+    costs its own insert. Returns ``(inserted, errors)`` where errors is a
+    list of ``(index, message)``.
+    """
+    inserted = 0
+    failed = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        cur.execute("SAVEPOINT bulk_chunk")
+        try:
+            cur.executemany(sql, [params for _, params in chunk])
+            inserted += len(chunk)
+            continue
+        except ROW_ERRORS:
+            cur.execute("ROLLBACK TO SAVEPOINT bulk_chunk")
+
+        for index, params in chunk:
+            cur.execute("SAVEPOINT bulk_row")
+            try:
+                cur.execute(sql, params)
+                inserted += 1
+            except ROW_ERRORS as e:
+                cur.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                failed.append((index, str(e)))
+    return inserted, failed
@@ -1,9 +1,15 @@
+from store.dao.bulk import insert_rows
+from store.dao.instrument import instrumented
+from store.dao.versions import bumps
+from store.db.connection import cursor, transaction
+
+
+@instrumented
 class EnrollmentDAO:
-    def __init__(self, db):
+    def __init__(self, db=None):
         self.db = db
 
     def get_all_enrollments(self):
-        cursor = self.db.cursor()
         sql = """
             SELECT 
                 enrollments.id, 
@@ -15,35 +21,67 @@ class EnrollmentDAO:
             JOIN users ON enrollments.user_id = users.id
             JOIN courses ON enrollments.course_id = courses.id
         """
-        cursor.execute(sql)
-        result = cursor.fetchall()
-        cursor.close()
-        return result
+        with cursor(self.db) as cur:
+            cur.execute(sql)
+            return cur.fetchall()
 
 
+    @bumps('enrollments')
     def add_enrollment(self, user_id, course_id, completion_status):
         sql = """
             INSERT INTO enrollments (user_id, course_id, enrollment_date, completion_status)
             VALUES (%s, %s, NOW(), %s)
         """
-        cursor = self.db.cursor()
-        cursor.execute(sql, (user_id, course_id, completion_status))
-        self.db.commit()
+        with transaction(self.db) as cur:
+            cur.execute(sql, (user_id, course_id, completion_status))
+
+    @bumps('enrollments')
+    def add_enrollments(self, rows, chunk_size=500):
+        """Bulk insert ``(index, (user_id, course_id, completion_status))`` rows in one transaction."""
+        sql = """
+            INSERT INTO enrollments (user_id, course_id, enrollment_date, completion_status)
+            VALUES (%s, %s, NOW(), %s)
+        """
+        with transaction(self.db) as cur:
+            return insert_rows(cur, sql, rows, chunk_size)
+
+    @bumps('enrollments')
+    def add_dated_enrollments(self, rows, chunk_size=500):
+        """Bulk insert ``(index, (user_id, course_id, enrollment_date, completion_status))`` rows.
+
+        A None date means now. Returns ``(inserted, errors)`` like add_enrollments.
+        """
+        sql = """
+            INSERT INTO enrollments (user_id, course_id, enrollment_date, completion_status)
+            VALUES (%s, %s, COALESCE(%s, NOW()), %s)
+        """
+        with transaction(self.db) as cur:
+            return insert_rows(cur, sql, rows, chunk_size)
+
+    def get_user_ids_by_names(self, names):
+        """Map user names to ids in one query; for duplicate names the lowest id wins."""
+        return self._ids_by("SELECT name, MIN(id) FROM users WHERE name IN ({}) GROUP BY name", names)
+
+    def get_course_ids_by_titles(self, titles):
+        """Map course titles to ids in one query; for duplicate titles the lowest id wins."""
+        return self._ids_by("SELECT title, MIN(id) FROM courses WHERE title IN ({}) GROUP BY title", titles)
+
+    def _ids_by(self, sql, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        # Resolved for an insert, so read from the primary: a replica may not have new rows yet
+        with cursor(self.db, primary=True) as cur:
+            cur.execute(sql.format(", ".join(["%s"] * len(keys))), tuple(keys))
+            return dict(cur.fetchall())
 
+    @bumps('enrollments')
     def delete_enrollment(self, enrollment_id):
         sql = "DELETE FROM enrollments WHERE id = %s"
-        cursor = self.db.cursor()
-        cursor.execute(sql, (enrollment_id,))
-        self.db.commit()
+        with transaction(self.db) as cur:
+            cur.execute(sql, (enrollment_id,))
     
+    @bumps('enrollments')
     def add_enrollment_by_names(self, user_name, course_title, enrollment_date, completion_status):
-        try:
-            cursor = self.db.cursor()
-            cursor.callproc('InsertEnrollmentByNames', (user_name, course_title, enrollment_date, completion_status))
-            self.db.commit()
-        except Exception as e:
-            self.db.rollback()
-            raise e
-        finally:
-            cursor.close()
-    
\ No newline at end of file
+        with transaction(self.db) as cur:
+            cur.callproc('InsertEnrollmentByNames', (user_name, course_title, enrollment_date, completion_status))
@@ -0,0 +1,78 @@
+import functools
+import inspect
+import time
+
+from store.metrics import REGISTRY
+
+QUERY_SECONDS = REGISTRY.histogram(
+    "dao_query_duration_seconds", "Time spent inside DAO methods, including pool checkout", ("dao", "method"))
+ROWS_RETURNED = REGISTRY.counter("dao_rows_returned_total", "Rows handed back by DAO methods", ("dao", "method"))
+ERRORS = REGISTRY.counter("dao_errors_total", "DAO calls that raised", ("dao", "method"))
+
+
+def _row_count(result):
+    # fetchall() lists count per row, fetchone() rows/None as one/zero
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return 1
+    if result is None:
+        return 0
+    return None
+
+
+def _wrap(dao, name, method):
+    labels = (dao, name)
+
+    if inspect.isgeneratorfunction(inspect.unwrap(method)):
+        @functools.wraps(method)
+        def generator(*args, **kwargs):
+            # Only time spent producing rows counts, not the consumer's work between them
+            rows = 0
+            elapsed = 0.0
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        row = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - started
+                    rows += 1
+                    yield row
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except Exception:
+                ERRORS.inc(*labels)
+                raise
+            finally:
+                QUERY_SECONDS.observe(elapsed, *labels)
+                ROWS_RETURNED.inc(*labels, amount=rows)
+        return generator
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            ERRORS.inc(*labels)
+            raise
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - started, *labels)
+        rows = _row_count(result)
+        if rows is not None:
+            ROWS_RETURNED.inc(*labels, amount=rows)
+        return result
+    return wrapper
+
+
+def instrumented(cls):
+    """Class decorator timing every public method of a DAO and counting the rows it returns."""
+    for name, method in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.isfunction(method):
+            setattr(cls, name, _wrap(cls.__name__, name, method))
+    return cls
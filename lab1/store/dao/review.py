@@ -1,14 +1,34 @@
+from mysql.connector import errors
+
+from store.dao.instrument import instrumented
+from store.db.connection import transaction
+
+
+@instrumented
 class ReviewDAO:
-    def __init__(self, db):
+    def __init__(self, db=None):
         self.db = db
 
     def call_insert_review_procedure(self, course_id, user_id, rating, comment):
         """Виклик збереженої процедури InsertIntoReviews."""
-        try:
-            cursor = self.db.cursor()
-            cursor.callproc('InsertIntoReviews', (course_id, user_id, rating, comment))
-            self.db.commit()
-            cursor.close()
-        except Exception as e:
-            self.db.rollback()
-            raise e
+        # Rating aggregates follow from the triggers on reviews
+        with transaction(self.db) as cur:
+            cur.callproc('InsertIntoReviews', (course_id, user_id, rating, comment))
+
+    def insert_reviews(self, reviews):
+        """Insert many ReviewDTOs with one commit (group commit).
+
+        Each review runs InsertIntoReviews under its own savepoint, so a
+        rejected review is rolled back alone. Returns ``{index: exception}``
+        for the reviews that failed; if the commit itself fails, raises.
+        """
+        failed = {}
+        with transaction(self.db) as cur:
+            for index, review in enumerate(reviews):
+                cur.execute("SAVEPOINT review_item")
+                try:
+                    cur.callproc('InsertIntoReviews', (review.course_id, review.user_id, review.rating, review.comment))
+                except errors.DatabaseError as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT review_item")
+                    failed[index] = e
+        return failed
@@ -1,15 +1,78 @@
+import logging
+
+from mysql.connector import errorcode, errors
+
+from store.dao.instrument import instrumented
+from store.db.connection import cursor, transaction
+
+logger = logging.getLogger(__name__)
+
+# course_rating_stats and the triggers that keep it current are created by
+# migrations/0001_course_rating_stats.sql
+REBUILD_RATING_STATS_SQL = """
+    INSERT INTO course_rating_stats (course_id, review_count, rating_sum, rating_min, rating_max)
+    SELECT course_id, COUNT(*), SUM(rating), MIN(rating), MAX(rating)
+    FROM reviews
+    WHERE rating IS NOT NULL
+    GROUP BY course_id
+    ON DUPLICATE KEY UPDATE
+        review_count = VALUES(review_count),
+        rating_sum = VALUES(rating_sum),
+        rating_min = VALUES(rating_min),
+        rating_max = VALUES(rating_max)
+"""
+
+# Used until the migration has run: the same numbers, scanned from reviews
+RATINGS_FROM_REVIEWS_SQL = """
+    SELECT COUNT(rating), SUM(rating), MIN(rating), MAX(rating)
+    FROM reviews
+"""
+
+
+@instrumented
 class StatisticDAO:
-    def __init__(self, db):
+    def __init__(self, db=None):
         self.db = db
 
     def call_statistic_function(self, stat_type):
         """Виклик процедури CallStatisticFunction"""
-        try:
-            cursor = self.db.cursor()
+        with cursor(self.db) as cur:
             # Виклик збереженої процедури
-            cursor.callproc('CallStatisticFunction', (stat_type,))
-            result = cursor.fetchall()
-            cursor.close()
-            return result
-        except Exception as e:
-            raise e
+            cur.callproc('CallStatisticFunction', (stat_type,))
+            # mysql.connector exposes procedure result sets via stored_results()
+            rows = []
+            for result in cur.stored_results():
+                rows.extend(result.fetchall())
+            return rows
+
+    def get_rating_stats(self, course_id=None):
+        """Return ``(count, sum, min, max)`` from the aggregates, for one course or all."""
+        with cursor(self.db) as cur:
+            try:
+                if course_id is None:
+                    cur.execute("""
+                        SELECT SUM(review_count), SUM(rating_sum), MIN(rating_min), MAX(rating_max)
+                        FROM course_rating_stats
+                    """)
+                else:
+                    cur.execute("""
+                        SELECT review_count, rating_sum, rating_min, rating_max
+                        FROM course_rating_stats
+                        WHERE course_id = %s
+                    """, (course_id,))
+            except errors.ProgrammingError as e:
+                if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                    raise
+                logger.warning("course_rating_stats is missing, scanning reviews; "
+                               "apply migrations/0001_course_rating_stats.sql")
+                if course_id is None:
+                    cur.execute(RATINGS_FROM_REVIEWS_SQL)
+                else:
+                    cur.execute(RATINGS_FROM_REVIEWS_SQL + " WHERE course_id = %s", (course_id,))
+            return cur.fetchone()
+
+    def rebuild_rating_stats(self):
+        """Recompute every course's aggregates from the reviews table."""
+        with transaction(self.db) as cur:
+            cur.execute("DELETE FROM course_rating_stats")
+            cur.execute(REBUILD_RATING_STATS_SQL)
@@ -1,18 +1,34 @@
 # dao/table_dao.py
 
+import re
+
+from store.dao.instrument import instrumented
+from store.dao.versions import table_versions
+from store.db.connection import transaction
+
+# Names end up in SQL as identifiers, so only plain MySQL table names pass
+TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,63}$')
+
+
+def validate_table_names(*names):
+    """Raise ValueError unless every name is a plain identifier and they are all distinct."""
+    for name in names:
+        if not isinstance(name, str) or not TABLE_NAME.match(name):
+            raise ValueError(f"Invalid table name: {name!r}")
+    if len(set(names)) != len(names):
+        raise ValueError("Table names must be distinct")
+
+
+@instrumented
 class TableDAO:
-    def __init__(self, db):
+    def __init__(self, db=None):
         self.db = db
 
     def create_and_distribute_data(self, parent_table, new_table1, new_table2):
         """Виклик процедури CreateAndDistributeData"""
         try:
-            cursor = self.db.cursor()
-            # Виклик процедури
-            cursor.callproc('CreateAndDistributeData', (parent_table, new_table1, new_table2))
-            self.db.commit()
-        except Exception as e:
-            self.db.rollback()
-            raise e
+            with transaction(self.db) as cur:
+                # Виклик процедури
+                cur.callproc('CreateAndDistributeData', (parent_table, new_table1, new_table2))
         finally:
-            cursor.close()
+            table_versions.bump(parent_table, new_table1, new_table2)
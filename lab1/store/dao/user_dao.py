@@ -1,134 +1,145 @@
-import pymysql
-from store.db.connection import get_db_connection
+import logging
 
+from mysql.connector import errors
+from store.dao.bulk import insert_rows
+from store.dao.instrument import instrumented
+from store.dao.versions import bumps
+from store.db.connection import cursor, prepared_cursor, prepared_statements_enabled, transaction
 
+logger = logging.getLogger(__name__)
+
+# Hot lookups run as per-connection prepared statements; execute() must get these exact objects
+USER_BY_ID_SQL = "SELECT id, name, email FROM users WHERE id = %s"
+USER_BY_NAME_SQL = "SELECT id, name, email FROM users WHERE name = %s"
+USER_COURSES_SQL = """
+    SELECT courses.id, courses.title, courses.description
+    FROM enrollments
+    JOIN courses ON enrollments.course_id = courses.id
+    WHERE enrollments.user_id = %s
+"""
+
+# Dashboard: the user, per-course rollups (completed/total modules) and module progress
+USER_DASHBOARD_SQL = """
+    SELECT id, name, email FROM users WHERE id = %s;
+
+    SELECT courses.id, courses.title, courses.description,
+           COUNT(DISTINCT modules.id) AS total_modules,
+           COUNT(DISTINCT CASE WHEN progress.status = 'completed' THEN modules.id END) AS completed_modules
+    FROM enrollments
+    JOIN courses ON enrollments.course_id = courses.id
+    LEFT JOIN modules ON modules.course_id = courses.id
+    LEFT JOIN progress ON progress.module_id = modules.id AND progress.user_id = enrollments.user_id
+    WHERE enrollments.user_id = %s
+    GROUP BY courses.id, courses.title, courses.description
+    ORDER BY courses.id;
+
+    SELECT modules.title, progress.status
+    FROM progress
+    JOIN modules ON progress.module_id = modules.id
+    WHERE progress.user_id = %s;
+"""
+
+
+@instrumented
 class UserDAO:
-    def __init__(self, db=None):
+    def __init__(self, db=None, prepared=None):
         self.db = db
-        self.use_pool = db is None
-
-    def _get_connection(self):
-        """Get a database connection from the pool if needed"""
-        if self.use_pool:
-            return get_db_connection()
-        return self.db
+        self.prepared = prepared_statements_enabled() if prepared is None else prepared
 
     def get_all_users(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        query = "SELECT id, name, email FROM users"  
-        cursor.execute(query)
-        users = cursor.fetchall()
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return users
+        with cursor(self.db) as cur:
+            query = "SELECT id, name, email FROM users"  
+            cur.execute(query)
+            return cur.fetchall()
+
+    def get_users_page(self, after=None, limit=100):
+        """Keyset page of users ordered by id, starting after the given id."""
+        with cursor(self.db) as cur:
+            if after is None:
+                query = "SELECT id, name, email FROM users ORDER BY id LIMIT %s"
+                cur.execute(query, (limit,))
+            else:
+                query = "SELECT id, name, email FROM users WHERE id > %s ORDER BY id LIMIT %s"
+                cur.execute(query, (after, limit))
+            return cur.fetchall()
 
     def get_user_by_id(self, user_id):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        query = "SELECT id, name, email FROM users WHERE id = %s"
-        cursor.execute(query, (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return user
+        with prepared_cursor(USER_BY_ID_SQL, self.db, self.prepared) as cur:
+            cur.execute(USER_BY_ID_SQL, (user_id,))
+            # Read the whole result so a reused prepared cursor is left clean
+            rows = cur.fetchall()
+            return rows[0] if rows else None
     
+    def get_users_by_ids(self, user_ids, chunk_size=500):
+        """Fetch many users with chunked `WHERE id IN (...)` queries on one connection."""
+        users = []
+        with cursor(self.db) as cur:
+            for start in range(0, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                query = f"SELECT id, name, email FROM users WHERE id IN ({placeholders})"
+                cur.execute(query, tuple(chunk))
+                users.extend(cur.fetchall())
+        return users
+
     def get_user_by_name(self, name):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        query = "SELECT id, name, email FROM users WHERE name = %s"
-        cursor.execute(query, (name,))
-        user = cursor.fetchone()
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return user
+        with prepared_cursor(USER_BY_NAME_SQL, self.db, self.prepared) as cur:
+            cur.execute(USER_BY_NAME_SQL, (name,))
+            rows = cur.fetchall()
+            return rows[0] if rows else None
 
+    @bumps('users')
     def insert_user(self, name, email):
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        with transaction(self.db) as cur:
             query = "INSERT INTO users (name, email) VALUES (%s, %s)"
-            cursor.execute(query, (name, email))
-            conn.commit()
-            cursor.close()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            if self.use_pool:
-                conn.close()
+            cur.execute(query, (name, email))
+
+    @bumps('users')
+    def insert_users(self, rows, chunk_size=500):
+        """Bulk insert ``(index, (name, email))`` rows in one transaction."""
+        query = "INSERT INTO users (name, email) VALUES (%s, %s)"
+        with transaction(self.db) as cur:
+            return insert_rows(cur, query, rows, chunk_size)
 
+    @bumps('users')
     def update_user(self, user_id, name=None, email=None, password=None):
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            query = "UPDATE users SET "
-            fields = []
-            values = []
-
-            if name:
-                fields.append("name = %s")
-                values.append(name)
-
-            if email:
-                fields.append("email = %s")
-                values.append(email)
-
-            if password:
-                fields.append("password = %s")
-                values.append(password)
-
-            if fields:
-                query += ", ".join(fields) + " WHERE id = %s"
-                values.append(user_id)
-                cursor.execute(query, tuple(values))
-                conn.commit()
-            cursor.close()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            if self.use_pool:
-                conn.close()
+        query = "UPDATE users SET "
+        fields = []
+        values = []
+
+        if name:
+            fields.append("name = %s")
+            values.append(name)
+
+        if email:
+            fields.append("email = %s")
+            values.append(email)
+
+        if password:
+            fields.append("password = %s")
+            values.append(password)
 
+        if not fields:
+            return
+
+        query += ", ".join(fields) + " WHERE id = %s"
+        values.append(user_id)
+        with transaction(self.db) as cur:
+            cur.execute(query, tuple(values))
+
+    @bumps('users')
     def delete_user(self, user_id):
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
+        with transaction(self.db) as cur:
             query = "DELETE FROM users WHERE id = %s"
-            cursor.execute(query, (user_id,))
-            conn.commit()
-            cursor.close()
-            return {'message': 'User deleted successfully!'}, 204
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            if self.use_pool:
-                conn.close()
+            cur.execute(query, (user_id,))
+        return {'message': 'User deleted successfully!'}, 204
 
     def get_user_courses(self, user_id):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        query = ("""
-            SELECT courses.id, courses.title, courses.description
-            FROM enrollments
-            JOIN courses ON enrollments.course_id = courses.id
-            WHERE enrollments.user_id = %s
-        """)
-        cursor.execute(query, (user_id,))
-        courses = cursor.fetchall()
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return courses
+        with prepared_cursor(USER_COURSES_SQL, self.db, self.prepared) as cur:
+            cur.execute(USER_COURSES_SQL, (user_id,))
+            return cur.fetchall()
     
     def get_all_users_with_courses(self):
-        conn = self._get_connection()
-        cursor = conn.cursor()
         sql = """
            SELECT users.id AS user_id, users.name, users.email,
             courses.id AS course_id, courses.title AS course_name, courses.description
@@ -137,47 +148,73 @@ class UserDAO:
             LEFT JOIN courses ON enrollments.course_id = courses.id
             ORDER BY users.id
         """
-        try:
-            cursor.execute(sql)
-            data = cursor.fetchall()
-        except pymysql.err.OperationalError as e:
-            print(f"Error occurred: {e}")
-            cursor.close()
-            if self.use_pool:
-                conn.close()
-            raise
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return data
+        with cursor(self.db) as cur:
+            try:
+                cur.execute(sql)
+                return cur.fetchall()
+            except errors.OperationalError as e:
+                logger.error("Error occurred: %s", e)
+                raise
+
+    def iter_users_with_courses(self, after=None, limit=None, batch_size=500):
+        """Stream the users/courses join row by row from an unbuffered cursor.
+
+        `after`/`limit` select a keyset window of users; rows come back
+        ordered by user id, so callers can group them without buffering.
+        """
+        conditions = []
+        params = []
+        if after is not None:
+            conditions.append("WHERE id > %s")
+            params.append(after)
+        conditions.append("ORDER BY id")
+        if limit is not None:
+            conditions.append("LIMIT %s")
+            params.append(limit)
+        sql = f"""
+            SELECT users.id AS user_id, users.name, users.email,
+            courses.id AS course_id, courses.title AS course_name, courses.description
+            FROM (SELECT id, name, email FROM users {' '.join(conditions)}) AS users
+            LEFT JOIN enrollments ON users.id = enrollments.user_id
+            LEFT JOIN courses ON enrollments.course_id = courses.id
+            ORDER BY users.id
+        """
+        with cursor(self.db, buffered=False) as cur:
+            cur.execute(sql, tuple(params))
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
 
     def get_user_progress(self, user_id):
-        conn = self._get_connection()
-        cursor = conn.cursor()
         query = ("""
             SELECT modules.title, progress.status
             FROM progress
             JOIN modules ON progress.module_id = modules.id
             WHERE progress.user_id = %s
         """)
-        cursor.execute(query, (user_id,))
-        progress = cursor.fetchall()
-        cursor.close()
-        if self.use_pool:
-            conn.close()
-        return progress
+        with cursor(self.db) as cur:
+            cur.execute(query, (user_id,))
+            return cur.fetchall()
     
+    def get_user_dashboard(self, user_id):
+        """User, enrolled courses with module rollups, and module progress in one round trip.
+
+        The three SELECTs go out as one multi-statement query on a single
+        checkout. Returns ``(user_row or None, course_rows, progress_rows)``.
+        """
+        with cursor(self.db) as cur:
+            cur.execute(USER_DASHBOARD_SQL, (user_id, user_id, user_id))
+            user = cur.fetchall()
+            cur.nextset()
+            courses = cur.fetchall()
+            cur.nextset()
+            progress = cur.fetchall()
+        return (user[0] if user else None), courses, progress
+
+    @bumps('users')
     def call_insert_noname_records_procedure(self):
         """Виклик процедури InsertNonameRecords"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.callproc('InsertNonameRecords')
-            conn.commit()
-            cursor.close()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            if self.use_pool:
-                conn.close()
+        with transaction(self.db) as cur:
+            cur.callproc('InsertNonameRecords')
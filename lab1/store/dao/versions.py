@@ -0,0 +1,83 @@
+import functools
+import os
+import threading
+import time
+
+from store.db.connection import note_local_write
+
+
+class TableVersions:
+    """Per-table write counters used to tag list responses.
+
+    DAO write methods bump the tables they touch after their transaction
+    ends, and readers take the version *before* querying, so a tag never
+    outlives the data it was issued for within this process. With replicas,
+    a bump also sends this process's reads to the primary until replicas can
+    have caught up, so a new version is never tagged onto replica rows.
+
+    Counters are per process. ETags carry a per-process epoch, so a tag
+    issued by one worker never validates against another. With several
+    workers, a client that keeps hitting one worker can still miss writes
+    made through the others. `ttl` bounds that window by rolling every tag
+    over after `ttl` seconds; use 0 when a single process serves writes.
+    """
+
+    def __init__(self, ttl=30.0, clock=time.time):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._pid = None
+        self._epoch = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(ttl=float(os.environ.get("ETAG_TTL", 30)))
+
+    def bump(self, *tables):
+        # Fence replica reads before the new version can be handed out
+        note_local_write()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, table):
+        return self._versions.get(table, 0)
+
+    def _process_epoch(self):
+        # Forked workers inherit the parent's counters, so each gets its own epoch
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._epoch = os.urandom(4).hex()
+                    self._pid = os.getpid()
+        return self._epoch
+
+    def etag(self, *tables):
+        """Opaque tag that changes whenever any of `tables` is written."""
+        parts = [self._process_epoch()]
+        if self.ttl > 0:
+            parts.append(str(int(self._clock() // self.ttl)))
+        parts.extend(str(self.get(table)) for table in tables)
+        return "-".join(parts)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._versions)
+
+
+table_versions = TableVersions.from_env()
+
+
+def bumps(*tables):
+    """Decorate a DAO write method so it bumps `tables` once it has run."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                # Also after a failure: a partial procedure may have committed rows
+                table_versions.bump(*tables)
+        return wrapper
+    return decorator
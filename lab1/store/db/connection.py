@@ -1,81 +1,658 @@
+import contextvars
+import itertools
+import logging
 import os
-import sys
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import pooling
+from mysql.connector import errorcode, pooling
+
+from store.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a free pooled connection")
+PREPARED_STATEMENTS = REGISTRY.counter(
+    "db_prepared_statements_total",
+    "Prepared cursor lookups: statement prepared, reused, or skipped (session reset on or disabled)",
+    ("result",))
+READ_ROUTES = REGISTRY.counter(
+    "db_read_routing_total", "Where read-only cursors were served from, and why", ("route",))
 
 # НЕ створюємо pool при імпорті
 _connection_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolTimeoutError(Exception):
+    """No pooled connection became free within DB_POOL_TIMEOUT seconds."""
+
+
+def configured_pool_size():
+    size = int(os.environ.get("DB_POOL_SIZE", 5))
+    return max(1, min(size, pooling.CNX_POOL_MAXSIZE))
+
+
+def _pool_timeout():
+    return float(os.environ.get("DB_POOL_TIMEOUT", 5))
+
+
+def _pool_reset_session():
+    # The reset on release deallocates prepared statements, so turning them on turns it off
+    if prepared_statements_enabled():
+        return False
+    return os.environ.get("DB_POOL_RESET_SESSION", "1").lower() not in ("0", "false", "no")
+
+
+def prepared_statements_enabled():
+    return os.environ.get("DB_PREPARED_STATEMENTS", "0").lower() not in ("0", "false", "no")
 
 
-def create_connection_pool():
+def create_connection_pool(host=None, port=None, pool_name="mypool", pool_size=None, connection_timeout=None):
     """Create database connection pool with Cloud Run support"""
-    db_host = os.environ.get("DB_HOST", "localhost")
+    db_host = host or os.environ.get("DB_HOST", "localhost")
     db_user = os.environ.get("DB_USER", "myuser")
     db_name = os.environ.get("DB_NAME", "mydb")
-    
-    # Debug logging - це з'явиться в Cloud Run logs
-    print(f"=== Database Configuration Debug ===", file=sys.stderr)
-    print(f"DB_HOST: {db_host}", file=sys.stderr)
-    print(f"DB_USER: {db_user}", file=sys.stderr)
-    print(f"DB_NAME: {db_name}", file=sys.stderr)
-    print(f"DB_PASSWORD present: {bool(os.environ.get('DB_PASSWORD'))}", file=sys.stderr)
-    print(f"===================================", file=sys.stderr)
-    
+    pool_size = pool_size or configured_pool_size()
+
+    logger.debug(
+        "Database configuration: host=%s user=%s database=%s password_set=%s pool_size=%s",
+        db_host, db_user, db_name, bool(os.environ.get("DB_PASSWORD")), pool_size,
+    )
+
     # Check if using Cloud SQL unix socket
     if db_host.startswith("/cloudsql/"):
         connection_config = {
-            "unix_socket": db_host, 
+            "unix_socket": db_host,
             "user": db_user,
             "password": os.environ.get("DB_PASSWORD", "mypassword"),
             "database": db_name,
-            "pool_name": "mypool",
-            "pool_size": 5,
-            "pool_reset_session": True,
+            "pool_name": pool_name,
+            "pool_size": pool_size,
+            "pool_reset_session": _pool_reset_session(),
+            # Drain unread rows when a streaming cursor is closed early
+            "consume_results": True,
         }
-        print(f"Using unix socket: {db_host}", file=sys.stderr)
+        logger.info("Using unix socket: %s", db_host)
     else:
         connection_config = {
             "host": db_host,
             "user": db_user,
             "password": os.environ.get("DB_PASSWORD", "mypassword"),
             "database": db_name,
-            "port": int(os.environ.get("DB_PORT", 3306)),
-            "pool_name": "mypool",
-            "pool_size": 5,
-            "pool_reset_session": True,
+            "port": port or int(os.environ.get("DB_PORT", 3306)),
+            "pool_name": pool_name,
+            "pool_size": pool_size,
+            "pool_reset_session": _pool_reset_session(),
+            # Drain unread rows when a streaming cursor is closed early
+            "consume_results": True,
         }
-        print(f"Using TCP connection: {db_host}:{os.environ.get('DB_PORT', 3306)}", file=sys.stderr)
-    
+        logger.info("Using TCP connection: %s:%s", db_host, connection_config["port"])
+    if connection_timeout is not None:
+        # Bounds connecting and every socket read, so a dead host fails fast
+        connection_config["connection_timeout"] = connection_timeout
+
     try:
         pool = pooling.MySQLConnectionPool(**connection_config)
-        print(f"✓ Database connection pool created successfully", file=sys.stderr)
+        logger.info("Database connection pool created")
         return pool
-    except Exception as e:
-        print(f"✗ Error creating connection pool: {type(e).__name__}: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+    except Exception:
+        logger.exception("Error creating connection pool")
         return None
 
 
-def get_db_connection():
-    """Get connection from pool with lazy initialization and automatic retry"""
+class ConnectionPool:
+    """MySQL pool with a bounded checkout wait and usage counters.
+
+    mysql.connector fails immediately when every connection is taken, so
+    checkouts are gated by a semaphore sized like the pool: callers queue for
+    up to ``timeout`` seconds instead of erroring out on a short burst.
+    """
+
+    def __init__(self, size=None, timeout=None, host=None, port=None, name="mypool", connection_timeout=None):
+        self.size = size or configured_pool_size()
+        self.timeout = _pool_timeout() if timeout is None else timeout
+        self.host = host
+        self.port = port
+        self.name = name
+        self.connection_timeout = connection_timeout
+        self.reset_session = _pool_reset_session()
+        if prepared_statements_enabled():
+            logger.info("Pool %s keeps sessions between checkouts so prepared statements "
+                        "are reused (DB_PREPARED_STATEMENTS=1)", name)
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.exhausted = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _raw_pool(self, recreate=False):
+        if self._pool is None or recreate:
+            with self._lock:
+                if self._pool is None or recreate:
+                    self._pool = create_connection_pool(
+                        self.host, self.port, self.name, self.size, self.connection_timeout)
+        if self._pool is None:
+            raise Exception("Database connection pool is not available")
+        return self._pool
+
+    def acquire(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.exhausted += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise PoolTimeoutError(
+                    f"No database connection available after {self.timeout}s "
+                    f"(pool size {self.size})"
+                )
+        waited = time.perf_counter() - started
+        POOL_WAIT_SECONDS.observe(waited)
+
+        try:
+            try:
+                conn = self._raw_pool().get_connection()
+            except mysql.connector.Error as err:
+                logger.warning("Error getting connection from pool, recreating it: %s", err)
+                # Try to recreate pool if it's broken
+                conn = self._raw_pool(recreate=True).get_connection()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def warm(self):
+        """Open the underlying pool now (it connects all `size` connections up front)."""
+        self._raw_pool()
+
+    def close(self, timeout=10.0):
+        """Wait up to `timeout` seconds for checked-out connections, then close idle ones."""
+        deadline = time.monotonic() + timeout
+        while self.in_use and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool._remove_connections()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'checkouts': self.checkouts,
+                'exhausted': self.exhausted,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_total,
+                'wait_seconds_max': self.wait_max,
+                'wait_seconds_avg': self.wait_total / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+def get_pool():
+    """Return the process-wide pool, creating it lazily."""
     global _connection_pool
-    
-    if _connection_pool is None:
-        _connection_pool = create_connection_pool()
-    
+
     if _connection_pool is None:
-        raise Exception("Database connection pool is not available")
-    
+        with _pool_lock:
+            if _connection_pool is None:
+                _connection_pool = ConnectionPool()
+    return _connection_pool
+
+
+def pool_stats():
+    return get_pool().stats()
+
+
+def _scrape_pool():
+    # Reading metrics must not open the pool
+    pool = _connection_pool
+    return pool.stats() if pool is not None else None
+
+
+REGISTRY.register_collector("db_pool", _scrape_pool, "Connection pool")
+
+
+def warm_pool():
+    """Create this process's pool eagerly, e.g. right after a worker forks."""
+    get_pool().warm()
+
+
+_warmup_lock = threading.Lock()
+_warmup = {"pid": None, "state": "idle", "attempts": 0, "error": None, "seconds": None}
+
+
+def start_pool_warmup(max_backoff=30.0):
+    """Warm this process's pool on a background thread, retrying until it connects.
+
+    Boot does not wait for MySQL; /_ready reports the outcome. Safe to call
+    repeatedly: only one warm-up runs per process.
+    """
+    with _warmup_lock:
+        if _warmup["pid"] == os.getpid() and _warmup["state"] in ("warming", "ready"):
+            return
+        _warmup.update(pid=os.getpid(), state="warming", attempts=0, error=None, seconds=None)
+    threading.Thread(target=_run_warmup, args=(max_backoff,), name="pool-warmup", daemon=True).start()
+
+
+def _run_warmup(max_backoff):
+    started = time.perf_counter()
+    delay = 0.5
+    while True:
+        try:
+            warm_pool()
+        except Exception as e:
+            logger.warning("Pool warm-up failed, retrying in %.1fs: %s", delay, e)
+            with _warmup_lock:
+                _warmup["attempts"] += 1
+                _warmup["error"] = str(e)
+            time.sleep(delay)
+            delay = min(delay * 2, max_backoff)
+            continue
+        with _warmup_lock:
+            _warmup.update(state="ready", error=None, seconds=time.perf_counter() - started)
+            _warmup["attempts"] += 1
+        logger.info("Pool warm after %.2fs", _warmup["seconds"])
+        return
+
+
+def pool_warmup_status():
+    """State of this process's warm-up; a pool opened by a request also counts as ready."""
+    with _warmup_lock:
+        status = dict(_warmup) if _warmup["pid"] == os.getpid() else {"state": "idle", "attempts": 0}
+    pool = _connection_pool
+    if pool is not None and pool._pool is not None:
+        status["state"] = "ready"
+    status.pop("pid", None)
+    return status
+
+
+def close_pool(timeout=10.0):
+    """Drain and close this process's pools (primary and replicas) within `timeout` in total."""
+    global _connection_pool, _replicas, _replica_monitor_pid
+
+    deadline = time.monotonic() + timeout
+    with _pool_lock:
+        pool, _connection_pool = _connection_pool, None
+        replicas, _replicas = _replicas, None
+        _replica_monitor_stop.set()
+        _replica_monitor_pid = None
+    for closing in ([pool] if pool is not None else []) + [replica.pool for replica in replicas or ()]:
+        closing.close(max(0.0, deadline - time.monotonic()))
+
+
+# Read/write split. Replicas are optional: DB_REPLICA_HOSTS lists them as
+# "host[:port]" or Cloud SQL socket paths, comma separated.
+_replicas = None
+_replica_cycle = None
+# Wall-clock time until which this context's reads must see the primary
+_primary_until = contextvars.ContextVar("primary_until", default=0.0)
+# Same, for every read in this process: set by any local write, because the
+# write also moves table versions (ETags) and cache generations, and a tag or
+# cache entry must never pair the new version with a replica's old rows
+_write_fence = 0.0
+_replica_monitor_pid = None
+_replica_monitor_stop = threading.Event()
+
+
+def read_your_writes_window():
+    return float(os.environ.get("DB_READ_STICKY_SECONDS", 5))
+
+
+def primary_until():
+    return _primary_until.get()
+
+
+def stick_to_primary(until):
+    """Route this context's reads to the primary until `until` (a time.time() value)."""
+    _primary_until.set(until)
+
+
+def replica_catch_up_window():
+    """Seconds a write may take to reach every replica still considered usable."""
+    max_lag = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+    interval = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
+    # Lag is only known as of the last check, so allow it to grow for one interval
+    return max(read_your_writes_window(), max_lag + interval)
+
+
+def note_local_write():
+    """Send all of this process's reads to the primary until replicas can have caught up."""
+    global _write_fence
+
+    if _replicas:
+        _write_fence = max(_write_fence, time.time() + replica_catch_up_window())
+
+
+class Replica:
+    """A replica pool plus the health and lag last observed on it."""
+
+    def __init__(self, index, host, port, size, max_lag, check_interval, connect_timeout):
+        self.index = index
+        self.host = host
+        self.pool = ConnectionPool(size=size, host=host, port=port, name=f"replica{index}",
+                                   connection_timeout=connect_timeout)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # Unusable until the monitor's first check passes
+        self.healthy = False
+        self.lag = None
+        self.error = "not checked yet"
+        self.checked_at = float("-inf")
+
+    def usable(self):
+        # Only reads state: checks run on the monitor thread, never in a request
+        return self.healthy
+
+    def check(self):
+        self.checked_at = time.monotonic()
+        try:
+            lag = self._replication_lag() if self.max_lag > 0 else 0
+        except mysql.connector.errors.ProgrammingError as e:
+            self.lag = None
+            if e.errno == errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR:
+                # Lag unknown: without it the replica cannot be held to max_lag, so it stays out
+                self.mark_unhealthy("replication lag unknown: the app user needs the REPLICATION "
+                                    "CLIENT privilege (or DB_REPLICA_MAX_LAG=0 to skip the lag check)")
+            else:
+                self.mark_unhealthy(e)
+            return
+        except Exception as e:
+            self.mark_unhealthy(e)
+            return
+        self.lag = lag
+        if lag is None or lag > self.max_lag:
+            self.healthy = False
+            self.error = "replication stopped" if lag is None else f"lagging {lag}s behind"
+            logger.warning("Replica %s unusable: %s", self.host, self.error)
+        else:
+            self.healthy = True
+            self.error = None
+
+    def _replication_lag(self):
+        conn = self.pool.acquire()
+        try:
+            cur = conn.cursor(dictionary=True)
+            try:
+                try:
+                    cur.execute("SHOW REPLICA STATUS")
+                except mysql.connector.errors.ProgrammingError as e:
+                    # MySQL before 8.0.22 only knows the old syntax; other errors are real
+                    if e.errno != errorcode.ER_PARSE_ERROR:
+                        raise
+                    cur.execute("SHOW SLAVE STATUS")
+                status = cur.fetchone()
+            finally:
+                cur.close()
+        finally:
+            self.pool.release(conn)
+        if status is None:
+            # Not replicating from anything: nothing to lag behind
+            return 0
+        return status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+
+    def mark_unhealthy(self, error):
+        error = str(error)
+        # Once per change, not on every check of a replica that stays down
+        if self.healthy or error != self.error:
+            logger.warning("Replica %s marked unhealthy: %s", self.host, error)
+        self.healthy = False
+        self.error = error
+        self.checked_at = time.monotonic()
+
+    def stats(self):
+        stats = self.pool.stats()
+        stats.update(healthy=int(self.healthy), lag_seconds=self.lag)
+        return stats
+
+
+def _parse_host(spec):
+    if spec.startswith("/") or ":" not in spec:
+        return spec, None
+    host, port = spec.rsplit(":", 1)
+    return host, int(port)
+
+
+def get_replicas():
+    """This process's replica list (empty without DB_REPLICA_HOSTS), built lazily."""
+    global _replicas, _replica_cycle
+
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                hosts = [spec.strip() for spec in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if spec.strip()]
+                size = int(os.environ.get("DB_REPLICA_POOL_SIZE", configured_pool_size()))
+                max_lag = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+                interval = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
+                connect_timeout = int(os.environ.get("DB_REPLICA_CONNECT_TIMEOUT", 3))
+                replicas = [
+                    Replica(index, *_parse_host(spec), size, max_lag, interval, connect_timeout)
+                    for index, spec in enumerate(hosts)
+                ]
+                _replica_cycle = itertools.cycle(replicas)
+                _replicas = replicas
+    if _replicas and _replica_monitor_pid != os.getpid():
+        _start_replica_monitor(_replicas)
+    return _replicas
+
+
+def _start_replica_monitor(replicas):
+    """Check replica health and lag every DB_REPLICA_CHECK_INTERVAL on a daemon thread."""
+    global _replica_monitor_pid, _replica_monitor_stop
+
+    with _pool_lock:
+        # Threads do not survive fork, so each worker starts its own monitor
+        if _replica_monitor_pid == os.getpid():
+            return
+        _replica_monitor_pid = os.getpid()
+        stop = _replica_monitor_stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            for replica in replicas:
+                replica.check()
+            stop.wait(min(replica.check_interval for replica in replicas))
+
+    threading.Thread(target=run, name="replica-monitor", daemon=True).start()
+
+
+def _pick_replica():
+    replicas = get_replicas()
+    for _ in range(len(replicas)):
+        replica = next(_replica_cycle)
+        if replica.usable():
+            return replica
+    return None
+
+
+def _scrape_replicas():
+    replicas = _replicas
+    if not replicas:
+        return None
+    return {
+        f"{replica.index}_{key}": value
+        for replica in replicas
+        for key, value in replica.stats().items()
+    }
+
+
+REGISTRY.register_collector("db_replica", _scrape_replicas, "Replica pools, by index")
+
+
+@contextmanager
+def connection(db=None, read_only=False):
+    """Yield ``db`` if given, otherwise a pooled connection returned on exit.
+
+    `read_only` work may be served by a healthy replica, unless this context
+    wrote recently (read-your-writes) or no replica is usable.
+    """
+    if db is not None:
+        yield db
+        return
+
+    if read_only and get_replicas():
+        with _read_connection() as conn:
+            yield conn
+        return
+
+    pool = get_pool()
+    conn = pool.acquire()
     try:
-        return _connection_pool.get_connection()
-    except mysql.connector.Error as err:
-        print(f"Error getting connection from pool: {err}")
-        # Try to recreate pool if it's broken
-        _connection_pool = create_connection_pool()
-        if _connection_pool is None:
-            raise Exception("Failed to recreate connection pool")
-        return _connection_pool.get_connection()
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def _read_connection():
+    replica = None
+    now = time.time()
+    if now < _primary_until.get():
+        route = "primary_sticky"
+    elif now < _write_fence:
+        route = "primary_recent_write"
+    else:
+        replica = _pick_replica()
+        route = "replica" if replica is not None else "primary_unavailable"
+
+    conn = None
+    if replica is not None:
+        try:
+            conn = replica.pool.acquire()
+        except PoolTimeoutError:
+            # Busy, not broken: borrow the primary this once
+            route = "primary_fallback"
+        except Exception as e:
+            replica.mark_unhealthy(e)
+            route = "primary_fallback"
+    READ_ROUTES.inc(route)
+
+    if conn is None:
+        pool = get_pool()
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+        return
+
+    try:
+        yield conn
+    except (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError) as e:
+        # Lost connection or server trouble: keep later reads off this replica
+        replica.mark_unhealthy(e)
+        raise
+    finally:
+        replica.pool.release(conn)
+
+
+@contextmanager
+def cursor(db=None, primary=False, **cursor_kwargs):
+    """Yield a cursor for read-only work; cursor and connection are always closed.
+
+    Reads may go to a replica; pass `primary` for reads that must see the
+    latest writes or for statements (like DDL) that are not reads at all.
+    """
+    with connection(db, read_only=not primary) as conn:
+        cur = conn.cursor(**cursor_kwargs)
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+@contextmanager
+def transaction(db=None, **cursor_kwargs):
+    """Yield a cursor whose work is committed on success and rolled back on error."""
+    with connection(db) as conn:
+        cur = conn.cursor(**cursor_kwargs)
+        try:
+            yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+    if db is None:
+        # Replicas may not have this write yet; read it back from the primary for a while
+        stick_to_primary(time.time() + read_your_writes_window())
+        note_local_write()
+
+
+def _statement_cache(conn):
+    # Kept on the underlying connection so it outlives the pooled wrapper;
+    # a reconnect gets a new connection id and invalidates every statement
+    raw = getattr(conn, "_cnx", conn)
+    cache = getattr(raw, "_prepared_statements", None)
+    if cache is None or cache[0] != raw.connection_id:
+        cache = raw._prepared_statements = (raw.connection_id, {})
+    return raw, cache[1]
+
+
+@contextmanager
+def prepared_cursor(operation, db=None, enabled=True):
+    """Yield a cursor for the fixed statement `operation`, prepared once per connection.
+
+    Later checkouts of the same connection reuse the statement, so MySQL
+    parses `operation` once instead of on every call. Pass the very same
+    string object to ``execute()`` — mysql.connector re-prepares whenever
+    the operation object changes — and fetch every row before leaving.
 
+    Pooled connections only keep statements when the session reset on
+    release is off, which DB_PREPARED_STATEMENTS=1 arranges. With a reset
+    pool or `enabled` false this is a plain cursor, counted as
+    db_prepared_statements_total{result="skipped"}.
+    """
+    if db is None and get_pool().reset_session:
+        enabled = False
+    if not enabled:
+        PREPARED_STATEMENTS.inc("skipped")
+        with cursor(db) as cur:
+            yield cur
+        return
 
-db_connection = None
+    with connection(db, read_only=True) as conn:
+        raw, statements = _statement_cache(conn)
+        cur = statements.get(operation)
+        if cur is None:
+            PREPARED_STATEMENTS.inc("prepared")
+            cur = statements[operation] = raw.cursor(prepared=True)
+        else:
+            PREPARED_STATEMENTS.inc("reused")
+        try:
+            yield cur
+        except Exception:
+            # The statement may be half-read or gone server-side; prepare afresh next time
+            statements.pop(operation, None)
+            try:
+                cur.close()
+            except Exception:
+                pass
+            raise
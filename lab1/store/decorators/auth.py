@@ -1,8 +1,81 @@
-from flask import request, jsonify
+from flask import request, jsonify, g
 from functools import wraps
+import hashlib
 import os
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+import re
+import threading
+import time
+from store.metrics import REGISTRY
+from store.service.cache import EntityCache
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class CachingRequest:
+    """google.auth transport that reuses one session and caches GET responses.
+
+    Google serves its token-signing certs with ``Cache-Control: max-age``;
+    honouring it means the certs are fetched once per rotation instead of
+    once per request.
+    """
+
+    def __init__(self, session=None):
+        # google.auth and requests add ~100ms to cold start; load them on first use
+        import requests
+        from google.auth.transport import requests as google_requests
+
+        self._request = google_requests.Request(session=session or requests.Session())
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if method != 'GET' or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        with self._lock:
+            cached = self._responses.get(url)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        response = self._request(url, method=method, headers=headers, timeout=timeout, **kwargs)
+        match = _MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        if response.status == 200 and match:
+            with self._lock:
+                self._responses[url] = (time.monotonic() + int(match.group(1)), response)
+        return response
+
+
+_certs_request = None
+_certs_request_lock = threading.Lock()
+# Verified claims keyed by token hash; each entry lives until the token's `exp`
+_verified_tokens = EntityCache.from_env("AUTH_TOKEN")
+REGISTRY.register_collector("auth_token_cache", _verified_tokens.stats, "Verified ID token cache")
+
+
+def _get_certs_request():
+    global _certs_request
+
+    if _certs_request is None:
+        with _certs_request_lock:
+            if _certs_request is None:
+                _certs_request = CachingRequest()
+    return _certs_request
+
+
+def verify_token(token, audience):
+    """Verify a Firebase ID token, reusing the result for repeat presentations."""
+    key = (audience, hashlib.sha256(token.encode()).hexdigest())
+    hit, claims = _verified_tokens.get(key)
+    if hit:
+        return claims
+
+    from google.oauth2 import id_token
+
+    claims = id_token.verify_firebase_token(token, _get_certs_request(), audience)
+    remaining = claims.get('exp', 0) - time.time()
+    if remaining > 0:
+        _verified_tokens.set(key, claims, ttl=remaining)
+    return claims
 
 
 def require_auth(f):
@@ -16,12 +89,7 @@ def require_auth(f):
         token = auth_header.split(' ')[1]
         CLIENT_ID = os.getenv('PROJECT_ID')
         try:
-            decoded_token = id_token.verify_firebase_token(
-                token,
-                google_requests.Request(),
-                CLIENT_ID
-            )
-            # Optionally, you can attach decoded_token to request context here
+            g.decoded_token = verify_token(token, CLIENT_ID)
         except Exception as e:
             return jsonify({'error': 'Invalid token', 'details': str(e)}), 401
 
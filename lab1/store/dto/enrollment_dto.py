@@ -1,6 +1,20 @@
 # enrollment_dto.py
 
+from store.dto.row_mapper import RowMapper, json_date
+
+
 class EnrollmentDTO:
+    __slots__ = ('enrollment_id', 'username', 'course_name', 'enrollment_date', 'completion_status')
+
+    # JSON key -> column in EnrollmentDAO.get_all_enrollments
+    ROW = RowMapper({
+        'id': 0,
+        'username': 1,
+        'course_name': 2,
+        'enrollment_date': 3,
+        'completion_status': 4,
+    }, converters={'enrollment_date': json_date})
+
     def __init__(self, enrollment_id, username, course_name, enrollment_date, completion_status):
         self.enrollment_id = enrollment_id
         self.username = username          
@@ -1,5 +1,7 @@
 # models/review_dto.py
 class ReviewDTO:
+    __slots__ = ('course_id', 'user_id', 'rating', 'comment')
+
     def __init__(self, course_id, user_id, rating, comment):
         self.course_id = course_id
         self.user_id = user_id
@@ -1,4 +1,12 @@
+from store.dto.row_mapper import RowMapper
+
+
 class UserDTO:
+    __slots__ = ('user_id', 'name', 'email')
+
+    # JSON key -> column in `SELECT id, name, email`
+    ROW = RowMapper({'id': 0, 'name': 1, 'email': 2})
+
     def __init__(self, user_id, name, email,):
         self.user_id = user_id
         self.name = name
@@ -15,6 +23,11 @@ class UserDTO:
 
         
 class CourseDTO:
+    __slots__ = ('course_id', 'title', 'description')
+
+    # JSON key -> column in `SELECT courses.id, courses.title, courses.description`
+    ROW = RowMapper({'id': 0, 'title': 1, 'description': 2})
+
     def __init__(self, course_id, title, description):
         self.course_id = course_id
         self.title = title
@@ -28,7 +41,17 @@ class CourseDTO:
         }
 
 
+class CourseProgressDTO:
+    # JSON key -> column in the dashboard's per-course rollup
+    ROW = RowMapper({'id': 0, 'title': 1, 'description': 2, 'total_modules': 3, 'completed_modules': 4})
+
+
 class ProgressDTO:
+    __slots__ = ('module_title', 'status')
+
+    # JSON key -> column in `SELECT modules.title, progress.status`
+    ROW = RowMapper({'module_title': 0, 'status': 1})
+
     def __init__(self, module_title, status):
         self.module_title = module_title
         self.status = status
@@ -3,11 +3,19 @@ from store.controller.enrollment_controller import enrollment_bp
 from store.controller.review import review_bp
 from store.controller.statistic import statistic_bp
 from store.controller.table_controller import table_bp
+from store.controller.metrics import metrics_bp
+from store.controller.admission import admission_bp
+from store.controller.consistency import consistency_bp
+from store.controller.jobs import jobs_bp
 
 
 def init_routes(app):
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admission_bp)
+    app.register_blueprint(consistency_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(enrollment_bp)
     app.register_blueprint(review_bp)
     app.register_blueprint(statistic_bp)
     app.register_blueprint(table_bp)
+    app.register_blueprint(jobs_bp)
@@ -1,24 +1,16 @@
 from flask import jsonify
 from store.dao.user_dao import UserDAO
 from store.service.user_service import UserService
-import requests
-import os
+from store.service.identity import IdentityClient, get_identity_client
 
 
 class AuthService:
-    def __init__(self, user_dao: UserDAO):
+    def __init__(self, user_dao: UserDAO, identity_client: IdentityClient = None):
         self.user_dao = user_dao
+        self.identity_client = identity_client or get_identity_client()
 
     def signup(self, request_model, user_service: UserService):
-        try:
-            response = requests.post(
-                f"https://identitytoolkit.googleapis.com/v1/accounts:signUp?key={os.getenv('IDENTITY_KEY')}",
-                headers={"Content-Type": "application/json"},
-                json=request_model.json
-            )
-        except Exception:
-            print("Response text:", response.text)
-            raise
+        self.identity_client.sign_up(request_model.json)
         data = request_model.json
         email = data['email']
         name = data.get('name', '')
@@ -27,15 +19,7 @@ class AuthService:
         return {"message": "User registered successfully"}
     
     def login(self, request_model):
-        try:
-            response = requests.post(
-                f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={os.getenv('IDENTITY_KEY')}",
-                headers={"Content-Type": "application/json"},
-                json=request_model.json
-            )
-        except Exception:
-            print("Response text:", response.text)
-            raise
+        response = self.identity_client.sign_in_with_password(request_model.json)
         data = response.json()
         id_token = data.get('idToken')
         return jsonify({'idToken': id_token}), response.status_code
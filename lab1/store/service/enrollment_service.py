@@ -1,25 +1,163 @@
 from store.dto.enrollment_dto import EnrollmentDTO
+from store.service.singleflight import coalesced
+
+
+class NameResolver:
+    """Per-import cache of user name / course title -> id, filled by batched lookups.
+
+    Names repeat heavily in a roster, so each distinct one is looked up once
+    per import; unknown names are cached as None.
+    """
+
+    def __init__(self, enrollment_dao):
+        self.enrollment_dao = enrollment_dao
+        self.users = {}
+        self.courses = {}
+
+    def prefetch(self, user_names, course_titles):
+        self._fill(self.users, user_names, self.enrollment_dao.get_user_ids_by_names)
+        self._fill(self.courses, course_titles, self.enrollment_dao.get_course_ids_by_titles)
+
+    @staticmethod
+    def _fill(cache, keys, lookup):
+        missing = {key for key in keys if key not in cache}
+        if not missing:
+            return
+        found = lookup(missing)
+        # MySQL collations are usually case-insensitive, so a match may come back in another case
+        folded = {key.casefold(): value for key, value in found.items()}
+        for key in missing:
+            cache[key] = found.get(key, folded.get(key.casefold()))
+
+
+class ImportInterrupted(Exception):
+    """An import stopped part way; the chunks up to `last_index` are committed."""
+
+    def __init__(self, cause, result):
+        super().__init__(str(cause))
+        self.inserted = result['inserted']
+        self.errors = result['errors']
+        self.unknown_users = sorted(result['unknown_users'])
+        self.unknown_courses = sorted(result['unknown_courses'])
+        # Still the requested `after` (None on a first attempt) if no chunk committed
+        self.last_index = result['last_index']
 
 
 class EnrollmentService:
     def __init__(self, enrollment_dao):  # Приймаємо enrollment_dao як параметр
         self.enrollment_dao = enrollment_dao
 
+    @coalesced('enrollments', 'users', 'courses')
     def get_all_enrollments(self):
         enrollments = self.enrollment_dao.get_all_enrollments()
-        return [
-            EnrollmentDTO(
-                enrollment[0], 
-                enrollment[1], 
-                enrollment[2], 
-                enrollment[3], 
-                enrollment[4]  
-            ).to_dict() for enrollment in enrollments
-        ]
+        # Dicts come out with sorted keys, ready for json_response(presorted=True)
+        return EnrollmentDTO.ROW.many(enrollments)
 
     def add_enrollment(self, user_id, course_id, completion_status):
         self.enrollment_dao.add_enrollment(user_id, course_id, completion_status)
 
+    def add_enrollments(self, records, chunk_size=500):
+        """Validate and bulk insert enrollment records; returns ``(inserted, errors)``."""
+        rows, errors = [], []
+        for index, record in records:
+            if not isinstance(record, dict):
+                errors.append((index, 'Record must be an object'))
+                continue
+            user_id = record.get('user_id')
+            course_id = record.get('course_id')
+            if not isinstance(user_id, int) or not isinstance(course_id, int):
+                errors.append((index, 'user_id and course_id must be integers'))
+                continue
+            rows.append((index, (user_id, course_id, record.get('completion_status'))))
+
+        if not rows:
+            return 0, errors
+        inserted, failed = self.enrollment_dao.add_enrollments(rows, chunk_size=chunk_size)
+        return inserted, errors + failed
+
+    def import_by_names(self, records, chunk_size=500, after=None):
+        """Import ``(index, record, error)`` enrollments that name their user and course.
+
+        Records are handled `chunk_size` at a time: names not seen earlier in
+        this import are resolved with one query per kind, then the chunk is
+        inserted with multi-row INSERTs and committed. Records at or before
+        index `after` are skipped. Returns ``(inserted, errors, unknown_users,
+        unknown_courses)``.
+
+        Committed chunks stay committed, so if anything other than a bad row
+        stops the import it raises ImportInterrupted with the summary of the
+        committed chunks and the last index they covered. Re-posting the same
+        body with `after` set to that index resumes without duplicates.
+        """
+        resolver = NameResolver(self.enrollment_dao)
+        result = {'inserted': 0, 'errors': [], 'unknown_users': set(), 'unknown_courses': set(),
+                  'last_index': after}
+        batch = []
+        try:
+            for item in records:
+                if after is not None and item[0] <= after:
+                    continue
+                batch.append(item)
+                if len(batch) >= chunk_size:
+                    self._import_batch(batch, resolver, chunk_size, result)
+                    batch = []
+            if batch:
+                self._import_batch(batch, resolver, chunk_size, result)
+        except Exception as e:
+            raise ImportInterrupted(e, result) from e
+        return (result['inserted'], result['errors'],
+                sorted(result['unknown_users']), sorted(result['unknown_courses']))
+
+    def _import_batch(self, batch, resolver, chunk_size, result):
+        # Nothing reaches `result` until the chunk commits, so an interrupted
+        # import reports exactly what a resume will not redo
+        errors = []
+        unknown_users, unknown_courses = set(), set()
+        valid = []
+        for index, record, error in batch:
+            if error:
+                errors.append((index, error))
+                continue
+            if not isinstance(record, dict):
+                errors.append((index, 'Record must be an object'))
+                continue
+            user_name = record.get('user_name')
+            course_title = record.get('course_title')
+            if not isinstance(user_name, str) or not user_name or not isinstance(course_title, str) or not course_title:
+                errors.append((index, 'user_name and course_title are required'))
+                continue
+            # Accept the /enrollments/by-names field names as well as the short ones
+            date = record.get('enrollment_date', record.get('date')) or None
+            status = record.get('completion_status', record.get('status')) or None
+            valid.append((index, user_name, course_title, date, status))
+
+        resolver.prefetch({item[1] for item in valid}, {item[2] for item in valid})
+
+        rows = []
+        for index, user_name, course_title, date, status in valid:
+            user_id = resolver.users[user_name]
+            course_id = resolver.courses[course_title]
+            if user_id is None or course_id is None:
+                unknown = []
+                if user_id is None:
+                    unknown_users.add(user_name)
+                    unknown.append(f"user '{user_name}'")
+                if course_id is None:
+                    unknown_courses.add(course_title)
+                    unknown.append(f"course '{course_title}'")
+                errors.append((index, 'Unknown ' + ' and '.join(unknown)))
+                continue
+            rows.append((index, (user_id, course_id, date, status)))
+
+        if rows:
+            inserted, failed = self.enrollment_dao.add_dated_enrollments(rows, chunk_size=chunk_size)
+            result['inserted'] += inserted
+            errors.extend(failed)
+        result['errors'].extend(errors)
+        result['unknown_users'] |= unknown_users
+        result['unknown_courses'] |= unknown_courses
+        result['last_index'] = batch[-1][0]
+
     def delete_enrollment(self, enrollment_id):
         self.enrollment_dao.delete_enrollment(enrollment_id)
         
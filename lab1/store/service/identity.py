@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+from store.metrics import REGISTRY
+
+DEFAULT_BASE_URL = "https://identitytoolkit.googleapis.com"
+# Statuses worth retrying for idempotent calls: throttling and transient upstream errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class IdentityClient:
+    """Keep-alive client for the Identity Toolkit REST API.
+
+    One pooled session is shared by every request. Calls time out and are
+    retried with exponential backoff. Sign-in has no side effects, so it is
+    retried on any connection failure and on throttling/5xx. Sign-up is only
+    retried when connecting timed out, the one failure where the request
+    certainly never reached the server. `base_url` can point at a local stub
+    for tests and benchmarks.
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=None, retries=None, backoff=None,
+                 pool_size=None, session=None):
+        self.api_key = api_key if api_key is not None else os.getenv('IDENTITY_KEY')
+        self.base_url = (base_url or os.environ.get('IDENTITY_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        self.timeout = timeout or (
+            float(os.environ.get('IDENTITY_CONNECT_TIMEOUT', 3.05)),
+            float(os.environ.get('IDENTITY_READ_TIMEOUT', 10)),
+        )
+        self.retries = int(os.environ.get('IDENTITY_RETRIES', 2)) if retries is None else retries
+        self.backoff = float(os.environ.get('IDENTITY_BACKOFF', 0.2)) if backoff is None else backoff
+
+        if session is None:
+            # Imported here: requests (with certifi) is a large share of cold start
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            pool_size = pool_size or int(os.environ.get('IDENTITY_POOL_SIZE', 10))
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def sign_up(self, payload):
+        # Not idempotent: a retry after the request went out could create a second account
+        return self._post('accounts:signUp', payload, retry_statuses=(), idempotent=False)
+
+    def sign_in_with_password(self, payload):
+        return self._post('accounts:signInWithPassword', payload, retry_statuses=RETRY_STATUSES)
+
+    def _post(self, operation, payload, retry_statuses, idempotent=True):
+        import requests
+
+        url = f"{self.base_url}/v1/{operation}"
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                response = self.session.post(
+                    url,
+                    params={'key': self.api_key},
+                    json=payload,
+                    timeout=self.timeout,
+                )
+            except requests.ConnectionError as e:
+                maybe_sent = not isinstance(e, requests.ConnectTimeout)
+                if attempt >= self.retries or (maybe_sent and not idempotent):
+                    self._record(operation, started, attempt, error=True)
+                    raise
+            else:
+                if response.status_code not in retry_statuses or attempt >= self.retries:
+                    self._record(operation, started, attempt, error=response.status_code >= 500)
+                    return response
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def _record(self, operation, started, retries, error):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            metrics = self._metrics.setdefault(operation, {
+                'calls': 0,
+                'errors': 0,
+                'retries': 0,
+                'latency_seconds_total': 0.0,
+                'latency_seconds_max': 0.0,
+            })
+            metrics['calls'] += 1
+            metrics['errors'] += int(error)
+            metrics['retries'] += retries
+            metrics['latency_seconds_total'] += elapsed
+            metrics['latency_seconds_max'] = max(metrics['latency_seconds_max'], elapsed)
+
+    def stats(self):
+        with self._lock:
+            return {operation: dict(metrics) for operation, metrics in self._metrics.items()}
+
+
+_identity_client = None
+_identity_client_lock = threading.Lock()
+
+
+def _scrape_identity():
+    # Nothing to report until the first auth call creates the client
+    if _identity_client is None:
+        return None
+    return {f"{operation.split(':')[-1]}_{key}": value
+            for operation, metrics in _identity_client.stats().items()
+            for key, value in metrics.items()}
+
+
+REGISTRY.register_collector("identity", _scrape_identity, "Identity Toolkit calls, by operation")
+
+
+def get_identity_client():
+    """Return the process-wide client so every request shares its connection pool."""
+    global _identity_client
+
+    if _identity_client is None:
+        with _identity_client_lock:
+            if _identity_client is None:
+                _identity_client = IdentityClient()
+    return _identity_client
@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+FINISHED = ('succeeded', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobQueueFullError(Exception):
+    """Every worker is busy and the pending queue is at capacity."""
+
+
+class Job:
+    """One background run: status, progress and outcome, safe to read while it runs."""
+
+    def __init__(self, kind, params=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = dict(sorted((params or {}).items()))
+        self.status = 'queued'
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def report(self, done, total=None):
+        """Record progress; `total` may stay None when it is unknown."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def check_cancelled(self):
+        """Call between units of work: raises JobCancelled once cancel() was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at,
+            'error': self.error,
+            'finished_at': self.finished_at,
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'progress': {'done': self.done, 'total': self.total},
+            'result': self.result,
+            'started_at': self.started_at,
+            'status': self.status,
+        }
+
+
+class JobRunner:
+    """In-process runner for long procedures with a bounded worker pool.
+
+    At most `max_workers` jobs run at once and `max_pending` more may wait;
+    beyond that submit() raises JobQueueFullError. Jobs cancel
+    cooperatively through Job.check_cancelled(). The last `keep` finished
+    jobs stay available for polling. Jobs and their ids live in this
+    process only, so polling relies on the deploy's session affinity and
+    running jobs on CPU that is not throttled between requests.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, keep=100):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep = keep
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=int(os.environ.get("JOBS_WORKERS", 2)),
+            max_pending=int(os.environ.get("JOBS_MAX_PENDING", 16)),
+            keep=int(os.environ.get("JOBS_KEEP", 100)),
+        )
+
+    def _get_executor(self):
+        # Threads do not survive fork, so each worker process gets its own pool
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="job")
+            self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, kind, fn, *args, params=None):
+        """Queue ``fn(job, *args)``; its return value becomes the job's result."""
+        job = Job(kind, params)
+        with self._lock:
+            active = sum(1 for other in self._jobs.values() if other.status not in FINISHED)
+            if active >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise JobQueueFullError(f"{active} jobs already queued or running")
+            self._jobs[job.id] = job
+            self.submitted += 1
+            self._prune()
+            self._get_executor().submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        if job.cancel_requested:
+            self._finish(job, 'cancelled')
+            return
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args)
+        except JobCancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, 'failed')
+        else:
+            self._finish(job, 'succeeded')
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        with self._lock:
+            setattr(self, status, getattr(self, status) + 1)
+        job._finished.set()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Request cancellation; a queued job never starts, a running one stops at its next check."""
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED:
+            job._cancel.set()
+        return job
+
+    def shutdown(self, timeout=10.0):
+        """Cancel everything still queued or running and wait up to `timeout` for it to stop."""
+        for job in self.list():
+            self.cancel(job.id)
+        deadline = time.monotonic() + timeout
+        for job in self.list():
+            job.wait(max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'queued': statuses.count('queued'),
+                'running': statuses.count('running'),
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+            }
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Return the process-wide runner shared by every blueprint that starts jobs."""
+    global _job_runner
+
+    if _job_runner is None:
+        with _job_runner_lock:
+            if _job_runner is None:
+                _job_runner = JobRunner.from_env()
+    return _job_runner
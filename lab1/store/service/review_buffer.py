@@ -0,0 +1,182 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from store.service.cache import _env_flag
+
+_STOP = object()
+
+
+class BufferFullError(Exception):
+    """The review queue is at capacity; the caller should retry later."""
+
+
+class BufferClosedError(Exception):
+    """The buffer was closed (the worker is shutting down); nothing more is accepted."""
+
+
+class ReviewWriteBuffer:
+    """Queues reviews and writes them in batches with one commit per batch.
+
+    A background thread collects up to `batch_size` reviews, waiting at most
+    `max_delay` seconds after the first one, and hands them to
+    ReviewDAO.insert_reviews. Each submitted review gets a Future that
+    resolves once its batch commits (or carries the error that rejected it).
+    Cancelling the Future before its batch is written withdraws the review.
+    """
+
+    def __init__(self, review_dao, batch_size=100, max_delay=0.01, max_queue=10000, enabled=True):
+        self.review_dao = review_dao
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        # Orders submit() against close(), so nothing lands behind the stop marker
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+        self._pid = None
+        self.enqueued = 0
+        self.rejected = 0
+        self.committed = 0
+        self.failed = 0
+        self.withdrawn = 0
+        self.batches = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @classmethod
+    def from_env(cls, review_dao):
+        return cls(
+            review_dao,
+            batch_size=int(os.environ.get("REVIEW_BATCH_SIZE", 100)),
+            max_delay=float(os.environ.get("REVIEW_BATCH_MAX_DELAY_MS", 10)) / 1000,
+            max_queue=int(os.environ.get("REVIEW_QUEUE_SIZE", 10000)),
+            enabled=_env_flag("REVIEW_BUFFER_ENABLED", "0"),
+        )
+
+    def submit(self, review):
+        """Queue a ReviewDTO; returns a Future resolved when it is committed."""
+        self._ensure_started()
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise BufferClosedError("Review buffer is closed")
+            try:
+                self._queue.put_nowait((review, future, time.monotonic()))
+            except queue.Full:
+                with self._lock:
+                    self.rejected += 1
+                raise BufferFullError(f"Review queue is full ({self._queue.maxsize} pending)")
+        with self._lock:
+            self.enqueued += 1
+        return future
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so a worker starts its own flusher
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="review-flusher", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Marks the rest running, so from here on cancel() fails and callers know the review may land
+        live = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if len(live) < len(batch):
+            with self._lock:
+                self.withdrawn += len(batch) - len(live)
+        if not live:
+            return
+        batch = live
+        started = time.monotonic()
+        try:
+            failed = self.review_dao.insert_reviews([review for review, _, _ in batch])
+        except Exception as e:
+            failed = {index: e for index in range(len(batch))}
+        finished = time.monotonic()
+
+        for index, (_, future, enqueued_at) in enumerate(batch):
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(True)
+
+        flush_seconds = finished - started
+        oldest_wait = finished - batch[0][2]
+        with self._lock:
+            self.batches += 1
+            self.failed += len(failed)
+            self.committed += len(batch) - len(failed)
+            self.flush_seconds_total += flush_seconds
+            self.flush_seconds_max = max(self.flush_seconds_max, flush_seconds)
+            self.wait_seconds_total += sum(finished - enqueued_at for _, _, enqueued_at in batch)
+            self.wait_seconds_max = max(self.wait_seconds_max, oldest_wait)
+
+    def close(self, timeout=10.0):
+        """Flush what is queued, stop the flusher thread and refuse later submits."""
+        deadline = time.monotonic() + timeout
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is None or self._pid != os.getpid() or not thread.is_alive():
+                return
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                return
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        with self._lock:
+            done = self.committed + self.failed
+            return {
+                'enabled': self.enabled,
+                'closed': self._closed,
+                'queue_depth': self._queue.qsize(),
+                'enqueued': self.enqueued,
+                'rejected': self.rejected,
+                'committed': self.committed,
+                'failed': self.failed,
+                'withdrawn': self.withdrawn,
+                'batches': self.batches,
+                'avg_batch_size': done / self.batches if self.batches else 0.0,
+                'flush_seconds_total': self.flush_seconds_total,
+                'flush_seconds_max': self.flush_seconds_max,
+                'flush_seconds_avg': self.flush_seconds_total / self.batches if self.batches else 0.0,
+                'commit_wait_seconds_avg': self.wait_seconds_total / done if done else 0.0,
+                'commit_wait_seconds_max': self.wait_seconds_max,
+            }
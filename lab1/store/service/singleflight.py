@@ -0,0 +1,104 @@
+import functools
+import os
+import threading
+import time
+
+from store.dao.versions import table_versions
+from store.db.connection import primary_until
+from store.metrics import REGISTRY
+from store.service.cache import _env_flag
+
+COALESCED_CALLS = REGISTRY.counter(
+    "service_coalesced_calls_total",
+    "Service reads by role: 'leader' ran the query, 'follower' shared a leader's result",
+    ("method", "role"))
+
+# Coalescing on/off for everything, then which methods: '*' for every
+# decorated one, or e.g. "UserService.get_all_users,UserService.get_user_by_id"
+COALESCE_ENABLED = _env_flag("COALESCE_ENABLED", "1")
+COALESCE_METHODS = frozenset(
+    name.strip() for name in os.environ.get("COALESCE_METHODS", "*").split(",") if name.strip())
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome.
+
+    Nothing is kept after the call returns: a caller arriving later starts a
+    new call. Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return ``(result, shared)``; errors of the leader's call are raised in every caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'leaders': self.leaders, 'followers': self.followers}
+
+
+flights = SingleFlight()
+REGISTRY.register_collector('service_singleflight', flights.stats, 'Coalesced service reads')
+
+
+def coalesced(*tables):
+    """Share one in-flight call among concurrent identical calls of a read method.
+
+    The key is the method, the service instance and the arguments, plus the
+    versions of `tables` and whether reads are pinned to the primary, so a
+    caller never joins a read that started before this process's last write
+    to those tables.
+    """
+    def decorator(method):
+        name = method.__qualname__
+        if not COALESCE_ENABLED or not ({"*", name} & COALESCE_METHODS):
+            return method
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (name, id(self), args, tuple(sorted(kwargs.items())),
+                   tuple(table_versions.get(table) for table in tables),
+                   primary_until() > time.time())
+            result, shared = flights.do(key, method, self, *args, **kwargs)
+            COALESCED_CALLS.inc(name, "follower" if shared else "leader")
+            return result
+        return wrapper
+    return decorator
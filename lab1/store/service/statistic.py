@@ -7,3 +7,21 @@ class StatisticService:
     def get_statistic(self, stat_type):
         """Отримання статистики через DAO"""
         return self.statistic_dao.call_statistic_function(stat_type)
+
+    def get_rating_statistics(self, course_id=None):
+        """All rating statistics at once, read from the incrementally kept aggregates."""
+        row = self.statistic_dao.get_rating_stats(course_id)
+        count, total, minimum, maximum = row if row else (None, None, None, None)
+        count = int(count or 0)
+        return {
+            'AVG': float(total) / count if count else None,
+            'COUNT': count,
+            'MAX': maximum,
+            'MIN': minimum,
+            'SUM': int(total) if count else None,
+            'course_id': course_id,
+        }
+
+    def rebuild_rating_statistics(self):
+        """Recompute the aggregates from scratch, e.g. after a bulk load with the triggers disabled."""
+        self.statistic_dao.rebuild_rating_stats()
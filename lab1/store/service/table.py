@@ -4,4 +4,4 @@ class TableService:
 
     def create_and_distribute_data(self, parent_table, new_table1, new_table2):
         """Бізнес-логіка для виклику DAO"""
-        self.table_dao.create_and_distribute_data(parent_table, new_table1, new_table2)
\ No newline at end of file
+        self.table_dao.create_and_distribute_data(parent_table, new_table1, new_table2)
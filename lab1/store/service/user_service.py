@@ -1,69 +1,198 @@
 from store.dao.user_dao import UserDAO
-from collections import defaultdict
+from store.dto.user_dto import CourseProgressDTO, ProgressDTO, UserDTO
+from store.service.cache import EntityCache
+from store.service.singleflight import coalesced
+from itertools import groupby
+from operator import itemgetter
 
 
 class UserService:
-    def __init__(self, user_dao: UserDAO):
+    def __init__(self, user_dao: UserDAO, cache: EntityCache = None):
         self.user_dao = user_dao
+        # Read-through cache for point lookups, keyed by ('id', id) / ('name', name)
+        self.cache = cache if cache is not None else EntityCache.from_env("USER")
 
+    def _invalidate_user(self, user_id, *names):
+        self.cache.invalidate_where(lambda key, user: user[0] == user_id)
+        self.cache.invalidate(*(('name', name) for name in names if name))
+
+    @coalesced('users')
     def get_all_users(self):
         """Retrieve all users from the database."""
         return self.user_dao.get_all_users()
 
+    @coalesced('users')
+    def get_users_page(self, after=None, limit=100):
+        """Retrieve one keyset page of users with ids greater than `after`."""
+        return self.user_dao.get_users_page(after=after, limit=limit)
+
+    def iter_users(self, after=None, batch_size=500, limit=None):
+        """Yield users in id order, one keyset page at a time.
+
+        Each page is its own short query, so no connection is held while the
+        caller is busy writing rows out.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            page = self.user_dao.get_users_page(after=after, limit=size)
+            yield from page
+            if len(page) < size:
+                return
+            after = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+
     def insert_user(self, username, email):
         """Insert a new user into the database."""
-        return self.user_dao.insert_user(username, email)
+        try:
+            return self.user_dao.insert_user(username, email)
+        finally:
+            self.cache.invalidate(('name', username))
+
+    def insert_users(self, records, chunk_size=500):
+        """Validate and bulk insert user records; returns ``(inserted, errors)``."""
+        rows, errors = [], []
+        for index, record in records:
+            if not isinstance(record, dict) or not isinstance(record.get('email'), str) or not record['email']:
+                errors.append((index, 'email is required'))
+                continue
+            name = record.get('name', '')
+            if not isinstance(name, str):
+                errors.append((index, 'name must be a string'))
+                continue
+            rows.append((index, (name, record['email'])))
 
+        if not rows:
+            return 0, errors
+        try:
+            inserted, failed = self.user_dao.insert_users(rows, chunk_size=chunk_size)
+        finally:
+            self.cache.invalidate(*(('name', name) for _, (name, _) in rows))
+        return inserted, errors + failed
+
+    @coalesced('users')
     def get_user_by_id(self, user_id):
         """Retrieve a user by their ID."""
-        return self.user_dao.get_user_by_id(user_id)
+        return self._cached(('id', user_id), self.user_dao.get_user_by_id, user_id)
     
+    def get_users_by_ids(self, user_ids):
+        """Resolve many ids at once.
+
+        Returns the found users in request order (duplicates collapsed) and
+        the ids that do not exist. Cached users are served without a query.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        found = {}
+        to_load = []
+        for user_id in user_ids:
+            hit, user = self.cache.get(('id', user_id))
+            if hit:
+                found[user_id] = user
+            else:
+                to_load.append(user_id)
+
+        if to_load:
+            generation = self.cache.generation
+            for user in self.user_dao.get_users_by_ids(to_load):
+                found[user[0]] = user
+                self.cache.set(('id', user[0]), user, generation=generation)
+
+        users = [found[user_id] for user_id in user_ids if user_id in found]
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        return users, missing
+    
+    @coalesced('users')
     def get_user_by_name(self, name):
         """Retrieve a user by their name."""
-        return self.user_dao.get_user_by_name(name)
+        return self._cached(('name', name), self.user_dao.get_user_by_name, name)
+
+    def _cached(self, key, load, *args):
+        hit, user = self.cache.get(key)
+        if hit:
+            return user
+        generation = self.cache.generation
+        user = load(*args)
+        # Misses are not cached, so a later insert never has to chase them
+        if user is not None:
+            self.cache.set(key, user, generation=generation)
+        return user
 
     def update_user(self, user_id, name=None, email=None, password=None):
-        return self.user_dao.update_user(user_id, name=name, email=email, password=password)
+        try:
+            return self.user_dao.update_user(user_id, name=name, email=email, password=password)
+        finally:
+            self._invalidate_user(user_id, name)
 
     def delete_user(self, user_id):
         """Delete a user from the database."""
-        return self.user_dao.delete_user(user_id)
+        try:
+            return self.user_dao.delete_user(user_id)
+        finally:
+            self._invalidate_user(user_id)
 
+    @coalesced('enrollments', 'courses')
     def get_user_courses(self, user_id):
         """Retrieve all courses associated with a specific user."""
         return self.user_dao.get_user_courses(user_id)
 
+    @coalesced('progress', 'modules')
     def get_user_progress(self, user_id):
         """Retrieve the progress of a user across their enrolled modules."""
         return self.user_dao.get_user_progress(user_id)
 
+    @coalesced('users', 'enrollments', 'courses', 'modules', 'progress')
+    def get_user_dashboard(self, user_id):
+        """User, courses with module rollups and progress in one query; None if the user is missing."""
+        user, courses, progress = self.user_dao.get_user_dashboard(user_id)
+        if user is None:
+            return None
+        return {
+            'courses': CourseProgressDTO.ROW.many(courses),
+            'progress': ProgressDTO.ROW.many(progress),
+            'user': UserDTO.ROW.one(user),
+        }
+
+    @coalesced('users', 'enrollments', 'courses')
     def get_all_users_with_courses(self):
         data = self.user_dao.get_all_users_with_courses()
-        users_dict = defaultdict(lambda: {'id': None, 'username': None, 'email': None, 'courses': []})
-
-        for row in data:
-            user_id, username, email, course_id, course_name, course_description = row
-            
-            # Initialize user details if not already done
-            if users_dict[user_id]['id'] is None:
-                users_dict[user_id].update({
-                    'id': user_id,
-                    'username': username,
-                    'email': email,
-                    'courses': []
-                })
-
-            # If the user has an associated course, add it to their course list
-            if course_id:
-                users_dict[user_id]['courses'].append({
-                    'id': course_id,
-                    'name': course_name,
-                    'description': course_description
-                })
-
         # Convert to a list for JSON serialization
-        return list(users_dict.values())
+        return list(self._group_user_courses(data))
+
+    def iter_users_with_courses(self, after=None, limit=None):
+        """Yield one user with its courses at a time, in user id order."""
+        rows = self.user_dao.iter_users_with_courses(after=after, limit=limit)
+        return self._group_user_courses(rows)
+
+    @staticmethod
+    def _group_user_courses(rows):
+        """Fold join rows ordered by user id into one dict per user."""
+        for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+            user = None
+            for row in user_rows:
+                _, username, email, course_id, course_name, course_description = row
+
+                if user is None:
+                    user = {
+                        'courses': [],
+                        'email': email,
+                        'id': user_id,
+                        'username': username
+                    }
+
+                # If the user has an associated course, add it to their course list
+                if course_id:
+                    user['courses'].append({
+                        'description': course_description,
+                        'id': course_id,
+                        'name': course_name
+                    })
+            yield user
     
     def insert_noname_records(self):
         """Виклик процедури через DAO"""
-        self.user_dao.call_insert_noname_records_procedure()
+        try:
+            self.user_dao.call_insert_noname_records_procedure()
+        finally:
+            # The procedure can touch any row, so nothing cached is trustworthy
+            self.cache.clear()
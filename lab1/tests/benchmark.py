@@ -0,0 +1,382 @@
+"""In-process benchmark for the lab1 blueprints.
+
+Drives every blueprint through the Flask test client with the DAOs swapped
+for fakes that return N synthetic rows, so the numbers measure lab1's own
+overhead (routing, DTOs, serialization) without MySQL in the way.
+
+    python tests/benchmark.py                       # default row counts
+    python tests/benchmark.py --rows 10 1000 --seconds 0.5 --out baseline.json
+    python tests/benchmark.py --only users_list enrollments_list
+    python tests/benchmark.py --serialization       # DTO path vs compact row path
+    python tests/benchmark.py --prepared            # hot UserDAO lookups on the real DB (DB_* env)
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+
+import main  # noqa: E402
+from store.controller import enrollment_controller, review, statistic, table_controller, user_controller  # noqa: E402
+from store.controller.response import json_response  # noqa: E402
+from store.dto.enrollment_dto import EnrollmentDTO  # noqa: E402
+from store.dto.user_dto import UserDTO  # noqa: E402
+from store.service.cache import EntityCache  # noqa: E402
+from store.service.user_service import UserService  # noqa: E402
+
+
+class FakeUserDAO:
+    def __init__(self, rows):
+        self.users = [(i, f"user{i}", f"user{i}@example.com") for i in range(1, rows + 1)]
+        self.courses = [(i, f"Course {i}", f"Description of course {i}") for i in range(1, rows + 1)]
+        self.progress = [(f"Module {i}", "completed" if i % 2 else "in_progress") for i in range(1, rows + 1)]
+        # Two courses per user, like a typical join fan-out
+        self.users_with_courses = [
+            user + course
+            for user in self.users
+            for course in self.courses[:2]
+        ]
+
+    def get_all_users(self):
+        return self.users
+
+    def get_users_page(self, after=None, limit=100):
+        start = after or 0
+        return self.users[start:start + limit]
+
+    def get_user_by_id(self, user_id):
+        return self.users[0]
+
+    def get_user_by_name(self, name):
+        return self.users[0]
+
+    def get_users_by_ids(self, user_ids, chunk_size=500):
+        return self.users[:len(user_ids)]
+
+    def get_user_courses(self, user_id):
+        return self.courses
+
+    def get_all_users_with_courses(self):
+        return self.users_with_courses
+
+    def iter_users_with_courses(self, after=None, limit=None, batch_size=500):
+        return iter(self.users_with_courses)
+
+    def get_user_progress(self, user_id):
+        return self.progress
+
+    def get_user_dashboard(self, user_id):
+        rollups = [course + (4, i % 5) for i, course in enumerate(self.courses)]
+        return self.users[0], rollups, self.progress
+
+    def insert_user(self, name, email):
+        pass
+
+    def update_user(self, user_id, name=None, email=None, password=None):
+        pass
+
+
+class FakeEnrollmentDAO:
+    def __init__(self, rows):
+        date = datetime.date(2024, 9, 1)
+        self.enrollments = [(i, f"user{i}", f"Course {i}", date, "in_progress") for i in range(1, rows + 1)]
+
+    def get_all_enrollments(self):
+        return self.enrollments
+
+    def add_enrollment(self, user_id, course_id, completion_status):
+        pass
+
+
+class FakeReviewDAO:
+    def call_insert_review_procedure(self, course_id, user_id, rating, comment):
+        pass
+
+
+class FakeStatisticDAO:
+    def call_statistic_function(self, stat_type):
+        return [(4.5,)]
+
+    def get_rating_stats(self, course_id=None):
+        return (120, 540, 1, 5)
+
+
+class FakeTableDAO:
+    def create_and_distribute_data(self, parent_table, new_table1, new_table2):
+        pass
+
+
+def install_fakes(rows):
+    """Point every blueprint's service/DAO at fakes serving `rows` rows."""
+    user_controller.user_service.user_dao = FakeUserDAO(rows)
+    # Measure the uncached path; the cache would hide per-row work
+    user_controller.user_service.cache = EntityCache(enabled=False)
+    enrollment_controller.enrollment_service.enrollment_dao = FakeEnrollmentDAO(rows)
+    review.review_dao = FakeReviewDAO()
+    statistic.statistic_service.statistic_dao = FakeStatisticDAO()
+    table_controller.table_service.table_dao = FakeTableDAO()
+
+
+# name -> (method, path, json body)
+CASES = {
+    "users_list": ("GET", "/users", None),
+    "users_page": ("GET", "/users?limit=100", None),
+    "users_stream": ("GET", "/users?stream=1", None),
+    "user_by_id": ("GET", "/users/1", None),
+    "users_batch": ("GET", "/users/batch?ids=" + ",".join(str(i) for i in range(1, 51)), None),
+    "user_courses": ("GET", "/users/1/courses", None),
+    "user_progress": ("GET", "/users/1/progress", None),
+    "user_dashboard": ("GET", "/users/1/dashboard", None),
+    "users_with_courses": ("GET", "/users/courses", None),
+    "users_with_courses_stream": ("GET", "/users/courses?stream=1", None),
+    "user_update": ("PUT", "/users/1", {"name": "renamed"}),
+    "enrollments_list": ("GET", "/enrollments", None),
+    "enrollment_create": ("POST", "/enrollments", {"user_id": 1, "course_id": 1, "completion_status": "in_progress"}),
+    "review_create": ("POST", "/reviews", {"course_id": 1, "user_id": 1, "rating": 5, "comment": "great"}),
+    "statistic": ("GET", "/statistics?type=AVG", None),
+    "rating_statistics": ("GET", "/statistics/ratings", None),
+    # wait=1 keeps the job synchronous so each iteration measures a full run
+    "tables_distribute": ("POST", "/tables/distribute?wait=1",
+                          {"parent_table": "users", "new_table1": "a", "new_table2": "b"}),
+}
+
+
+class SerializationTimer:
+    """Accumulates time spent turning response payloads into JSON."""
+
+    def __init__(self, app):
+        self.app = app
+        self.seconds = 0.0
+
+    def __enter__(self):
+        timer = self
+
+        class TimingEncoder(self.app.json_encoder):
+            def encode(self, o):
+                started = time.perf_counter()
+                try:
+                    return super().encode(o)
+                finally:
+                    timer.seconds += time.perf_counter() - started
+
+        self._original = self.app.json_encoder
+        self.app.json_encoder = TimingEncoder
+        return self
+
+    def __exit__(self, *exc):
+        self.app.json_encoder = self._original
+
+
+def _request(client, method, path, body):
+    response = client.open(path, method=method, json=body)
+    # Consume streamed bodies so their generators actually run
+    data = response.get_data()
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {path} -> {response.status_code}: {data[:200]!r}")
+    return len(data)
+
+
+def bench_case(client, method, path, body, seconds, min_iterations):
+    # Warm up routing, caches and lazy imports
+    for _ in range(3):
+        size = _request(client, method, path, body)
+
+    with SerializationTimer(main.app) as timer:
+        iterations = 0
+        started = time.perf_counter()
+        while iterations < min_iterations or time.perf_counter() - started < seconds:
+            _request(client, method, path, body)
+            iterations += 1
+        elapsed = time.perf_counter() - started
+
+    # Separate pass with tracemalloc on: it slows everything down, so keep it out of the timing
+    samples = max(1, min(iterations, 20))
+    tracemalloc.start()
+    peak = 0
+    blocks = 0
+    for _ in range(samples):
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _request(client, method, path, body)
+        peak += tracemalloc.get_traced_memory()[1] - baseline
+        after = tracemalloc.take_snapshot()
+        blocks += sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "rps": iterations / elapsed,
+        "us_per_request": elapsed / iterations * 1e6,
+        "serialize_us_per_request": timer.seconds / iterations * 1e6,
+        "peak_alloc_kib_per_request": peak / samples / 1024,
+        "retained_blocks_per_request": blocks / samples,
+        "response_bytes": size,
+    }
+
+
+def run(rows_list, seconds, min_iterations, only=None):
+    client = main.app.test_client()
+    results = {}
+    for rows in rows_list:
+        install_fakes(rows)
+        for name, (method, path, body) in CASES.items():
+            if only and name not in only:
+                continue
+            results.setdefault(name, {})[str(rows)] = bench_case(client, method, path, body, seconds, min_iterations)
+            stats = results[name][str(rows)]
+            print(f"{name:<28}{rows:>7}{stats['rps']:>11.0f}{stats['us_per_request']:>12.1f}"
+                  f"{stats['serialize_us_per_request']:>12.1f}{stats['peak_alloc_kib_per_request']:>12.1f}"
+                  f"{stats['retained_blocks_per_request']:>10.0f}", flush=True)
+    return results
+
+
+def _legacy_users(rows):
+    return jsonify([UserDTO(user[0], user[1], user[2]).to_dict() for user in rows])
+
+
+def _compact_users(rows):
+    return json_response(UserDTO.ROW.many(rows), presorted=True)
+
+
+def _legacy_enrollments(rows):
+    return jsonify([EnrollmentDTO(*enrollment).to_dict() for enrollment in rows])
+
+
+def _compact_enrollments(rows):
+    return json_response(EnrollmentDTO.ROW.many(rows), presorted=True)
+
+
+def _users_with_courses(n):
+    return list(UserService._group_user_courses(FakeUserDAO(n).users_with_courses))
+
+
+def _dashboard(n):
+    return UserService(FakeUserDAO(n), cache=EntityCache(enabled=False)).get_user_dashboard(1)
+
+
+SERIALIZATION_CASES = {
+    "users": (lambda n: FakeUserDAO(n).users, _legacy_users, _compact_users),
+    "enrollments": (lambda n: FakeEnrollmentDAO(n).enrollments, _legacy_enrollments, _compact_enrollments),
+    # Hand-built dicts: json_response sorts their keys, which must still match jsonify byte for byte
+    "users_courses": (_users_with_courses, jsonify, json_response),
+    "dashboard": (_dashboard, jsonify, json_response),
+}
+
+
+def run_serialization(rows_list, seconds):
+    """Per-row cost of rows -> response body: DTO objects + jsonify vs RowMapper + json_response.
+
+    Every case first asserts both paths produce identical bytes.
+    """
+    print(f"{'payload':<14}{'rows':>7}{'dto ns/row':>13}{'compact ns/row':>16}{'speedup':>9}")
+    results = {}
+    with main.app.test_request_context():
+        for name, (make_rows, legacy, compact) in SERIALIZATION_CASES.items():
+            for rows in rows_list:
+                data = make_rows(rows)
+                if legacy(data).get_data() != compact(data).get_data():
+                    raise AssertionError(f"{name}: compact output differs from jsonify for {rows} rows")
+
+                timings = {}
+                for label, fn in (("dto", legacy), ("compact", compact)):
+                    iterations = 0
+                    started = time.perf_counter()
+                    while iterations < 3 or time.perf_counter() - started < seconds:
+                        fn(data)
+                        iterations += 1
+                    timings[label] = (time.perf_counter() - started) / iterations / max(rows, 1) * 1e9
+                results.setdefault(name, {})[str(rows)] = timings
+                print(f"{name:<14}{rows:>7}{timings['dto']:>13.0f}{timings['compact']:>16.0f}"
+                      f"{timings['dto'] / timings['compact']:>8.1f}x", flush=True)
+    return results
+
+
+PREPARED_CASES = {
+    "user_by_id": lambda dao, user: dao.get_user_by_id(user[0]),
+    "user_by_name": lambda dao, user: dao.get_user_by_name(user[1]),
+    "user_courses": lambda dao, user: dao.get_user_courses(user[0]),
+}
+
+
+def run_prepared(seconds, sample=100):
+    """Hot UserDAO lookups against the database in DB_*, with and without prepared statements.
+
+    Unlike the other modes this talks to MySQL: parse time only shows up
+    with a real server. DB_PREPARED_STATEMENTS=1 also stops the pool from
+    resetting sessions between checkouts, otherwise no statement survives.
+    """
+    os.environ["DB_PREPARED_STATEMENTS"] = "1"
+    from store.dao.user_dao import UserDAO
+    from store.db.connection import close_pool
+
+    close_pool()
+    users = UserDAO(prepared=False).get_users_page(limit=sample)
+    if not users:
+        raise SystemExit("--prepared needs at least one row in users")
+
+    print(f"{'query':<16}{'plain q/s':>12}{'prepared q/s':>15}{'speedup':>9}")
+    results = {}
+    for name, call in PREPARED_CASES.items():
+        rates = {}
+        for label, prepared in (("plain", False), ("prepared", True)):
+            dao = UserDAO(prepared=prepared)
+            # Warm-up also prepares the statement on the pooled connections
+            for user in users[:10]:
+                call(dao, user)
+            iterations = 0
+            started = time.perf_counter()
+            while iterations < 10 or time.perf_counter() - started < seconds:
+                call(dao, users[iterations % len(users)])
+                iterations += 1
+            rates[label] = iterations / (time.perf_counter() - started)
+        results[name] = rates
+        print(f"{name:<16}{rates['plain']:>12.0f}{rates['prepared']:>15.0f}"
+              f"{rates['prepared'] / rates['plain']:>8.2f}x", flush=True)
+    close_pool()
+    return results
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per case and row count")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="run a subset of cases")
+    parser.add_argument("--serialization", action="store_true",
+                        help="only compare the DTO and compact serialization paths")
+    parser.add_argument("--prepared", action="store_true",
+                        help="compare plain and prepared UserDAO lookups against the real database")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.prepared:
+        results = run_prepared(args.seconds)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump({"python": sys.version.split()[0], "prepared": results}, f, indent=2)
+        return 0
+
+    if args.serialization:
+        results = run_serialization(args.rows, args.seconds)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump({"python": sys.version.split()[0], "serialization": results}, f, indent=2)
+        return 0
+
+    print(f"{'case':<28}{'rows':>7}{'req/s':>11}{'us/req':>12}{'ser us':>12}{'peak KiB':>12}{'retained':>10}")
+    results = run(args.rows, args.seconds, args.min_iterations, set(args.only or ()))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
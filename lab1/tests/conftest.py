@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_until(condition, timeout=5):
+    """Poll `condition` until it holds; fail instead of hanging past `timeout`."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            raise AssertionError(f"condition not met within {timeout}s")
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def wait_until():
+    return _wait_until
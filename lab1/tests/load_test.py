@@ -1,179 +1,350 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+"""Load generator for the lab1 API.
+
+Runs a weighted mix of requests from a scenario file against BASE_URL and
+writes a JSON report with per-endpoint latency percentiles and histograms.
+
+    # closed loop: N users, each sends its next request when the last one returns
+    python tests/load_test.py run --scenario tests/scenarios/default.json \\
+        --mode closed --users 15 --duration 60 --out before.json
+
+    # open loop: fixed arrival rate, latency measured from the scheduled send time
+    python tests/load_test.py run --mode open --rate 50 --duration 60 --out after.json
+
+    # flag regressions between two reports (exit code 1 if any)
+    python tests/load_test.py compare before.json after.json --threshold 0.10
+"""
+import argparse
+import bisect
+import itertools
+import json
+import math
 import os
-from random import uniform
 import random
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from threading import Lock
 
-BASE_URL = os.environ.get("BASE_URL", "https://flask-app-500585355008.europe-west1.run.app")
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:8080")
+DEFAULT_SCENARIO = os.path.join(os.path.dirname(__file__), "scenarios", "default.json")
+
+PERCENTILES = (50, 90, 99, 99.9)
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Scenario:
+    """Weighted request mix loaded from a JSON scenario file.
+
+    Each request has ``name``, ``method``, ``path`` and ``weight``, plus an
+    optional ``json`` body. ``vars`` maps placeholder names to inclusive
+    ``[low, high]`` integer ranges drawn per request; ``{seq}`` is a unique
+    counter, handy for write payloads that need distinct values.
+    """
+
+    def __init__(self, spec):
+        self.name = spec.get("name", "scenario")
+        self.auth = spec.get("auth")
+        self.requests = spec["requests"]
+        self._weights = list(itertools.accumulate(r.get("weight", 1) for r in self.requests))
+        self._seq = itertools.count()
+        self._seq_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def pick(self, rng):
+        index = bisect.bisect_right(self._weights, rng.random() * self._weights[-1])
+        spec = self.requests[index]
+        with self._seq_lock:
+            values = {"seq": next(self._seq)}
+        for name, (low, high) in spec.get("vars", {}).items():
+            values[name] = rng.randint(low, high)
+        return spec["name"], spec.get("method", "GET"), _fill(spec["path"], values), _fill(spec.get("json"), values)
+
+
+def _fill(template, values):
+    if isinstance(template, str):
+        # A bare "{name}" keeps the variable's type, so JSON bodies get real integers
+        if template.startswith("{") and template.endswith("}") and template[1:-1] in values:
+            return values[template[1:-1]]
+        return template.format(**values)
+    if isinstance(template, list):
+        return [_fill(item, values) for item in template]
+    if isinstance(template, dict):
+        return {key: _fill(item, values) for key, item in template.items()}
+    return template
+
 
-print(f"Running load tests against {BASE_URL}")
+class Recorder:
+    """Thread-safe per-endpoint latency and status collection."""
 
-# Глобальні лічильники з thread-safe lock
-stats_lock = Lock()
-stats = {
-    'total': 0,
-    'success': 0,
-    'failed': 0,
-    'times': []
-}
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._statuses = {}
+        self._errors = {}
 
+    def record(self, endpoint, latency, status):
+        with self._lock:
+            self._latencies.setdefault(endpoint, []).append(latency)
+            statuses = self._statuses.setdefault(endpoint, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
 
-def get_token():
-    payload = {
-        "email": "test@gmail.com",
-        "password": "123456789",
-        "returnSecureToken": True
+    def total(self):
+        with self._lock:
+            return sum(len(values) for values in self._latencies.values())
+
+    def summary(self, elapsed):
+        with self._lock:
+            endpoints = {
+                endpoint: _summarize(latencies, self._statuses[endpoint], self._errors.get(endpoint, 0), elapsed)
+                for endpoint, latencies in self._latencies.items()
+            }
+            all_latencies = [latency for values in self._latencies.values() for latency in values]
+            statuses = {}
+            for per_endpoint in self._statuses.values():
+                for status, count in per_endpoint.items():
+                    statuses[status] = statuses.get(status, 0) + count
+            overall = _summarize(all_latencies, statuses, sum(self._errors.values()), elapsed)
+        return overall, endpoints
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def _summarize(latencies, statuses, errors, elapsed):
+    values = sorted(latencies)
+    histogram = [0] * (len(BUCKETS_MS) + 1)
+    for latency in values:
+        histogram[bisect.bisect_left(BUCKETS_MS, latency * 1000)] += 1
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": len(values) / elapsed if elapsed else 0.0,
+        "statuses": statuses,
+        "latency_ms": {
+            "mean": sum(values) / len(values) * 1000 if values else None,
+            "min": values[0] * 1000 if values else None,
+            "max": values[-1] * 1000 if values else None,
+            **{f"p{str(p).replace('.', '')}": (_percentile(values, p) or 0) * 1000 for p in PERCENTILES},
+        },
+        "histogram_ms": {
+            "buckets": list(BUCKETS_MS) + ["inf"],
+            "counts": histogram,
+        },
     }
+
+
+_sessions = threading.local()
+
+
+def _session():
+    """One keep-alive session per worker thread."""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def send(base_url, token, method, path, body, timeout):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        response = _session().request(method, f"{base_url}{path}", headers=headers, json=body, timeout=timeout)
+        # Drain the body so the connection goes back to the keep-alive pool
+        response.content
+        return response.status_code
+    except requests.RequestException as e:
+        return type(e).__name__
+
+
+def get_token(base_url, auth):
+    if not auth:
+        return None
     try:
-        response = requests.post(f"{BASE_URL}/login", json=payload, timeout=10)
+        response = requests.post(f"{base_url}/login", json={**auth, "returnSecureToken": True}, timeout=10)
         if response.status_code != 200:
             return None
         return response.json().get("idToken")
     except requests.RequestException as e:
-        print(f"Error obtaining token: {e}")
+        print(f"Error obtaining token: {e}", file=sys.stderr)
         return None
 
 
-def make_request(endpoint: str, token, method: str, data=None):
-    headers = {}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    url = f"{BASE_URL}{endpoint}"
+def run_closed(scenario, recorder, base_url, token, users, duration, seed, timeout):
+    """`users` workers each issue their next request as soon as the previous returns."""
+    stop_at = time.perf_counter() + duration
 
-    try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, timeout=30)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-        elif method.upper() == "PUT":
-            response = requests.put(url, headers=headers, json=data, timeout=30)
-        else:
-            raise ValueError("Unsupported HTTP method")
-        return {
-            "status": response.status_code,
-            "endpoint": endpoint,
-            "response_time": response.elapsed.total_seconds(),
-        }
-    except requests.RequestException as e:
-        return {
-            "status": "error",
-            "endpoint": endpoint,
-            "error": str(e)
-        }
-
-
-def continuous_load_worker(token, worker_id, stop_time):
-    """Безперервно відправляє запити до stop_time"""
-    local_stats = {'success': 0, 'failed': 0, 'times': []}
-    
-    endpoints = [
-        ("/users", "GET", None),
-        ("/users/2", "GET", None),
-    ]
-    
-    while time.time() < stop_time:
-        # Вибираємо випадковий endpoint
-        endpoint, method, data = random.choice(endpoints)
-        result = make_request(endpoint, token, method, data)
-        
-        if result['status'] in [200, 201, 204]:
-            local_stats['success'] += 1
-            if 'response_time' in result:
-                local_stats['times'].append(result['response_time'])
-        else:
-            local_stats['failed'] += 1
-        
-        # Мала пауза між запитами від ОДНОГО воркера
-        time.sleep(random.uniform(0.05, 0.15))
-    
-    # Оновлюємо глобальну статистику
-    with stats_lock:
-        stats['total'] += local_stats['success'] + local_stats['failed']
-        stats['success'] += local_stats['success']
-        stats['failed'] += local_stats['failed']
-        stats['times'].extend(local_stats['times'])
-
-
-def run_load_test(num_users=15, duration_seconds=60):
-    """
-    Постійне навантаження з num_users одночасних користувачів
-    
-    Args:
-        num_users: Кількість одночасних користувачів (>10 для масштабування)
-        duration_seconds: Тривалість тесту в секундах
-    """
-    print(f"🚀 Starting CONTINUOUS load test")
-    print(f"Target: {BASE_URL}")
-    print(f"Concurrent users: {num_users}")
-    print(f"Duration: {duration_seconds}s")
-    print(f"Expected: Should trigger 2nd instance (concurrency limit: 10)\n")
-    
-    # Отримати токен
-    token = get_token()
-    if not token:
-        print("⚠️  No token - testing public endpoints only")
-    
-    start_time = time.time()
-    stop_time = start_time + duration_seconds
-    
-    # Скидаємо статистику
-    with stats_lock:
-        stats['total'] = 0
-        stats['success'] = 0
-        stats['failed'] = 0
-        stats['times'] = []
-    
-    # Запускаємо workers які ПОСТІЙНО відправляють запити
-    with ThreadPoolExecutor(max_workers=num_users) as executor:
-        futures = [
-            executor.submit(continuous_load_worker, token, i, stop_time)
-            for i in range(num_users)
-        ]
-        
-        # Моніторинг прогресу
-        last_print = start_time
-        while time.time() < stop_time:
-            time.sleep(2)
-            if time.time() - last_print >= 5:
-                elapsed = time.time() - start_time
-                with stats_lock:
-                    rps = stats['total'] / elapsed if elapsed > 0 else 0
-                    print(f"⏱️  {elapsed:.0f}s | Total: {stats['total']} | "
-                          f"Success: {stats['success']} | Failed: {stats['failed']} | "
-                          f"RPS: {rps:.1f}")
-                last_print = time.time()
-        
-        # Чекаємо завершення всіх workers
+    def worker(worker_id):
+        rng = random.Random(seed * 1000003 + worker_id)
+        while time.perf_counter() < stop_at:
+            endpoint, method, path, body = scenario.pick(rng)
+            started = time.perf_counter()
+            status = send(base_url, token, method, path, body, timeout)
+            recorder.record(endpoint, time.perf_counter() - started, status)
+
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        futures = [executor.submit(worker, i) for i in range(users)]
+        _report_progress(recorder, duration)
         for future in futures:
             future.result()
-    
-    # Результати
-    elapsed = time.time() - start_time
-    print("\n" + "="*60)
-    print("📊 LOAD TEST RESULTS")
-    print("="*60)
-    print(f"Total Duration: {elapsed:.1f}s")
-    print(f"Total Requests: {stats['total']}")
-    print(f"Successful: {stats['success']} ({stats['success']/stats['total']*100:.1f}%)")
-    print(f"Failed: {stats['failed']} ({stats['failed']/stats['total']*100:.1f}%)")
-    print(f"Requests/second: {stats['total']/elapsed:.2f}")
-    
-    if stats['times']:
-        avg_response = sum(stats['times']) / len(stats['times'])
-        min_response = min(stats['times'])
-        max_response = max(stats['times'])
-        print(f"\nResponse Times:")
-        print(f"  Average: {avg_response:.3f}s")
-        print(f"  Min: {min_response:.3f}s")
-        print(f"  Max: {max_response:.3f}s")
-    
-    print(f"\n💡 Check Cloud Run metrics to see scaling events!")
-    print(f"   https://console.cloud.google.com/run/detail/europe-west1/flask-app/metrics")
+
+
+def run_open(scenario, recorder, base_url, token, rate, duration, seed, timeout, max_in_flight):
+    """Send requests at a fixed arrival rate regardless of how fast the server answers.
+
+    Latency is measured from each request's scheduled send time, so queueing
+    inside the generator counts against the server (no coordinated omission).
+    """
+    rng = random.Random(seed)
+    total = int(rate * duration)
+
+    def fire(scheduled, endpoint, method, path, body):
+        status = send(base_url, token, method, path, body, timeout)
+        recorder.record(endpoint, time.perf_counter() - scheduled, status)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        progress = threading.Thread(target=_report_progress, args=(recorder, duration), daemon=True)
+        progress.start()
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, scheduled, *scenario.pick(rng))
+
+
+def _report_progress(recorder, duration, every=5):
+    start = time.perf_counter()
+    while True:
+        remaining = duration - (time.perf_counter() - start)
+        if remaining <= 0:
+            return
+        time.sleep(min(every, remaining))
+        elapsed = time.perf_counter() - start
+        total = recorder.total()
+        print(f"{elapsed:5.0f}s | requests: {total} | rps: {total / elapsed:.1f}", file=sys.stderr)
+
+
+def run(args):
+    scenario = Scenario.load(args.scenario)
+    token = get_token(args.base_url, scenario.auth)
+    if scenario.auth and not token:
+        print("No token - authenticated endpoints will fail", file=sys.stderr)
+
+    print(f"Running '{scenario.name}' ({args.mode} loop) against {args.base_url} for {args.duration}s",
+          file=sys.stderr)
+    recorder = Recorder()
+    started = time.perf_counter()
+    if args.mode == "open":
+        run_open(scenario, recorder, args.base_url, token, args.rate, args.duration, args.seed,
+                 args.timeout, args.max_in_flight)
+    else:
+        run_closed(scenario, recorder, args.base_url, token, args.users, args.duration, args.seed,
+                   args.timeout)
+    elapsed = time.perf_counter() - started
+
+    overall, endpoints = recorder.summary(elapsed)
+    report = {
+        "scenario": scenario.name,
+        "base_url": args.base_url,
+        "mode": args.mode,
+        "users": args.users if args.mode == "closed" else None,
+        "rate": args.rate if args.mode == "open" else None,
+        "duration_seconds": elapsed,
+        "seed": args.seed,
+        "overall": overall,
+        "endpoints": endpoints,
+    }
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}", file=sys.stderr)
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<24}{'reqs':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'p999':>9}  (ms)")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["overall"])]
+    for endpoint, stats in rows:
+        latency = stats["latency_ms"]
+        print(f"{endpoint:<24}{stats['requests']:>8}{stats['errors']:>6}{stats['rps']:>9.1f}"
+              f"{latency['p50']:>9.1f}{latency['p90']:>9.1f}{latency['p99']:>9.1f}{latency['p999']:>9.1f}")
+
+
+def compare(args):
+    """Print per-endpoint deltas and return 1 if any exceed the threshold."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    regressions = []
+    names = ["TOTAL"] + sorted(set(baseline["endpoints"]) & set(candidate["endpoints"]))
+    print(f"{'endpoint':<24}{'metric':>8}{'baseline':>12}{'candidate':>12}{'change':>9}")
+    for name in names:
+        old = baseline["overall"] if name == "TOTAL" else baseline["endpoints"][name]
+        new = candidate["overall"] if name == "TOTAL" else candidate["endpoints"][name]
+        checks = [(p, old["latency_ms"][p], new["latency_ms"][p], 1) for p in ("p50", "p90", "p99", "p999")]
+        checks.append(("rps", old["rps"], new["rps"], -1))
+        old_error_rate = old["errors"] / old["requests"] if old["requests"] else 0
+        new_error_rate = new["errors"] / new["requests"] if new["requests"] else 0
+        for metric, before, after, direction in checks:
+            if not before:
+                continue
+            change = (after - before) / before
+            flag = direction * change > args.threshold
+            if flag:
+                regressions.append((name, metric))
+            print(f"{name:<24}{metric:>8}{before:>12.2f}{after:>12.2f}{change:>+9.1%}{'  REGRESSION' if flag else ''}")
+        if new_error_rate > old_error_rate + args.threshold / 10:
+            regressions.append((name, "errors"))
+            print(f"{name:<24}{'errors':>8}{old_error_rate:>12.2%}{new_error_rate:>12.2%}{'':>9}  REGRESSION")
+
+    print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="generate load and write a report")
+    run_parser.add_argument("--base-url", default=BASE_URL)
+    run_parser.add_argument("--scenario", default=DEFAULT_SCENARIO)
+    run_parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    run_parser.add_argument("--users", type=int, default=15, help="closed loop: concurrent workers")
+    run_parser.add_argument("--rate", type=float, default=20, help="open loop: requests per second")
+    run_parser.add_argument("--max-in-flight", type=int, default=200, help="open loop: sender threads")
+    run_parser.add_argument("--duration", type=float, default=60)
+    run_parser.add_argument("--timeout", type=float, default=30)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--out", help="write the JSON report here")
+
+    compare_parser = sub.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative change that counts as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return compare(args)
+    run(args)
+    return 0
 
 
 if __name__ == "__main__":
-    # Тест з 15 користувачами протягом 60 секунд
-    # 15 > 10 (concurrency) → має створитися 2-й контейнер
-    run_load_test(num_users=15, duration_seconds=60)
+    sys.exit(main())
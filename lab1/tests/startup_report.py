@@ -0,0 +1,96 @@
+"""Import-time report for lab1's cold start.
+
+Imports `main` in a fresh interpreter under ``python -X importtime`` and
+summarises where the time goes, so a change that drags a heavy dependency
+back into startup shows up before it reaches Cloud Run.
+
+    python tests/startup_report.py                  # top 15 imports + per-package totals
+    python tests/startup_report.py --top 30 --out startup.json
+    python tests/startup_report.py --runs 5         # median of several cold starts
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LAB1_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load on first use, not at startup
+LAZY_MODULES = ("google.oauth2", "google.auth", "requests", "pymysql", "googleapiclient")
+
+
+def measure(module="main"):
+    """One cold import of `module`: wall time plus -X importtime records."""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=LAB1_DIR, capture_output=True, text=True, check=True,
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return float(result.stdout.strip().splitlines()[-1]), records
+
+
+def summarise(records, top):
+    by_package = {}
+    for record in records:
+        package = record["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + record["self_us"]
+    loaded = {record["module"] for record in records}
+    return {
+        "slowest": sorted(records, key=lambda r: r["cumulative_us"], reverse=True)[:top],
+        "packages": sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top],
+        "eager_lazy_modules": sorted(m for m in loaded if m.startswith(LAZY_MODULES)),
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=1, help="cold starts to take the median over")
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    walls = []
+    for _ in range(args.runs):
+        wall, records = measure(args.module)
+        walls.append(wall)
+    report = summarise(records, args.top)
+    report["import_seconds"] = statistics.median(walls)
+
+    print(f"import {args.module}: {report['import_seconds'] * 1000:.1f} ms "
+          f"(median of {args.runs}, {len(records)} modules)\n")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for record in report["slowest"]:
+        print(f"{record['cumulative_us'] / 1000:>14.1f}{record['self_us'] / 1000:>10.1f}  "
+              f"{'  ' * record['depth']}{record['module']}")
+    print(f"\n{'self ms':>14}  package")
+    for package, self_us in report["packages"]:
+        print(f"{self_us / 1000:>14.1f}  {package}")
+    if report["eager_lazy_modules"]:
+        print("\nimported at startup but meant to be lazy: " + ", ".join(report["eager_lazy_modules"]))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["eager_lazy_modules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,40 @@
+import threading
+
+from store.controller.admission import AdmissionLimiter, _parse_limits
+
+
+def test_parse_limits():
+    assert _parse_limits('user=8:16, heavy=2,*=5:5') == {'user': (8, 16), 'heavy': (2, 0), '*': (5, 5)}
+    assert _parse_limits('') == {}
+
+
+def test_rejects_immediately_when_queue_is_full():
+    limiter = AdmissionLimiter('t', limit=1, queue=0, max_wait=5)
+    assert limiter.acquire() is None
+    assert limiter.acquire() == 'queue_full'
+    limiter.release()
+    assert limiter.acquire() is None
+    stats = limiter.stats()
+    assert (stats['active'], stats['admitted'], stats['rejected']) == (1, 2, 1)
+
+
+def test_queued_request_times_out():
+    limiter = AdmissionLimiter('t', limit=1, queue=1, max_wait=0.05)
+    limiter.acquire()
+    assert limiter.acquire() == 'timeout'
+    assert limiter.stats()['waiting'] == 0
+
+
+def test_queued_request_is_admitted_on_release(wait_until):
+    limiter = AdmissionLimiter('t', limit=1, queue=1, max_wait=5)
+    limiter.acquire()
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(limiter.acquire()))
+    waiter.start()
+    wait_until(lambda: limiter.stats()['waiting'] == 1)
+    # The queue slot is taken, so a third request is shed
+    assert limiter.acquire() == 'queue_full'
+    limiter.release()
+    waiter.join(5)
+    assert outcome == [None]
+    assert limiter.stats()['active'] == 1
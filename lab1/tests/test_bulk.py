@@ -0,0 +1,44 @@
+from mysql.connector import errors
+
+from store.dao.bulk import insert_rows
+
+
+class FakeCursor:
+    """Rejects any statement that carries a negative id, like a CHECK constraint would."""
+
+    def __init__(self):
+        self.rows = []
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql if params is None else 'row')
+        if params is not None:
+            self._insert([params])
+
+    def executemany(self, sql, seq_params):
+        self.statements.append(f'chunk of {len(seq_params)}')
+        self._insert(seq_params)
+
+    def _insert(self, seq_params):
+        if any(params[0] < 0 for params in seq_params):
+            raise errors.IntegrityError(msg='negative id')
+        self.rows.extend(seq_params)
+
+
+def test_clean_chunks_go_out_as_one_statement_each():
+    cur = FakeCursor()
+    rows = [(index, (index, f'u{index}')) for index in range(5)]
+    assert insert_rows(cur, 'INSERT', rows, chunk_size=2) == (5, [])
+    assert [s for s in cur.statements if s != 'SAVEPOINT bulk_chunk'] == ['chunk of 2', 'chunk of 2', 'chunk of 1']
+
+
+def test_rejected_chunk_is_retried_row_by_row():
+    cur = FakeCursor()
+    rows = [(0, (1, 'a')), (1, (-1, 'bad')), (2, (2, 'b')), (3, (3, 'c'))]
+    inserted, failed = insert_rows(cur, 'INSERT', rows, chunk_size=3)
+    assert inserted == 3
+    assert [index for index, _ in failed] == [1]
+    assert 'negative id' in failed[0][1]
+    assert cur.rows == [(1, 'a'), (2, 'b'), (3, 'c')]
+    assert 'ROLLBACK TO SAVEPOINT bulk_chunk' in cur.statements
+    assert cur.statements.count('ROLLBACK TO SAVEPOINT bulk_row') == 1
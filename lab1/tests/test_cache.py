@@ -0,0 +1,54 @@
+from store.service.cache import EntityCache
+
+
+def test_hit_miss_and_ttl(clock):
+    cache = EntityCache(maxsize=10, ttl=5, clock=clock)
+    assert cache.get('a') == (False, None)
+    cache.set('a', 1)
+    assert cache.get('a') == (True, 1)
+    clock.now = 5
+    assert cache.get('a') == (False, None)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 2, 1)
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = EntityCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_set_from_stale_generation_is_dropped():
+    cache = EntityCache()
+    generation = cache.generation
+    # A write lands between the load and the store
+    cache.invalidate('a')
+    cache.set('a', 'stale', generation=generation)
+    assert cache.get('a') == (False, None)
+    cache.set('a', 'fresh', generation=cache.generation)
+    assert cache.get('a') == (True, 'fresh')
+
+
+def test_invalidate_where_and_clear():
+    cache = EntityCache()
+    cache.set(('id', 1), (1, 'ann'))
+    cache.set(('name', 'ann'), (1, 'ann'))
+    cache.set(('id', 2), (2, 'bob'))
+    cache.invalidate_where(lambda key, user: user[0] == 1)
+    assert cache.get(('id', 1))[0] is False
+    assert cache.get(('name', 'ann'))[0] is False
+    assert cache.get(('id', 2)) == (True, (2, 'bob'))
+    cache.clear()
+    assert cache.stats()['size'] == 0
+    assert cache.stats()['invalidations'] == 3
+
+
+def test_disabled_cache_stores_nothing():
+    cache = EntityCache(maxsize=0)
+    cache.set('a', 1)
+    assert cache.get('a') == (False, None)
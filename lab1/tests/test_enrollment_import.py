@@ -0,0 +1,59 @@
+import pytest
+
+from store.service.enrollment_service import EnrollmentService, ImportInterrupted
+
+
+class FakeEnrollmentDAO:
+    """Knows users ann/bob and course sql; the insert on call `fail_on` raises."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.inserted = []
+        self.calls = 0
+
+    def get_user_ids_by_names(self, names):
+        return {name: user_id for name, user_id in (('ann', 1), ('bob', 2)) if name in names}
+
+    def get_course_ids_by_titles(self, titles):
+        return {'sql': 10} if 'sql' in titles else {}
+
+    def add_dated_enrollments(self, rows, chunk_size=500):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise ConnectionError('lost connection')
+        self.inserted.extend(index for index, _ in rows)
+        return len(rows), []
+
+
+def roster(n):
+    names = ('ann', 'bob', 'eve')
+    return [(index, {'user_name': names[index % 3], 'course_title': 'sql'}, None) for index in range(n)]
+
+
+def test_import_reports_unknown_names_and_parse_errors():
+    dao = FakeEnrollmentDAO()
+    records = roster(3) + [(3, None, 'Invalid JSON: x')]
+    inserted, errors, unknown_users, unknown_courses = EnrollmentService(dao).import_by_names(records, chunk_size=2)
+    assert inserted == 2
+    assert sorted(errors) == [(2, "Unknown user 'eve'"), (3, 'Invalid JSON: x')]
+    assert (unknown_users, unknown_courses) == (['eve'], [])
+
+
+def test_interrupted_import_reports_committed_chunks_and_resumes():
+    dao = FakeEnrollmentDAO(fail_on=2)
+    with pytest.raises(ImportInterrupted) as interrupted:
+        EnrollmentService(dao).import_by_names(roster(6), chunk_size=3)
+    e = interrupted.value
+    assert (e.inserted, e.last_index, e.unknown_users) == (2, 2, ['eve'])
+    assert e.errors == [(2, "Unknown user 'eve'")]
+    assert isinstance(e.__cause__, ConnectionError)
+
+    inserted, errors, _, _ = EnrollmentService(dao).import_by_names(roster(6), chunk_size=3, after=e.last_index)
+    assert (inserted, errors) == (2, [(5, "Unknown user 'eve'")])
+    assert dao.inserted == [0, 1, 3, 4]
+
+
+def test_failure_before_any_commit_keeps_after():
+    with pytest.raises(ImportInterrupted) as interrupted:
+        EnrollmentService(FakeEnrollmentDAO(fail_on=1)).import_by_names(roster(3), after=None)
+    assert (interrupted.value.inserted, interrupted.value.last_index) == (0, None)
@@ -0,0 +1,49 @@
+import pytest
+import requests
+
+from store.service.identity import IdentityClient
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    """Fails with each queued exception in turn, then answers 200."""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.posts = 0
+
+    def post(self, url, **kwargs):
+        self.posts += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return FakeResponse(200)
+
+
+def client(session):
+    return IdentityClient(api_key='key', base_url='http://stub', retries=2, backoff=0, session=session)
+
+
+def test_sign_in_retries_dropped_connections():
+    session = FakeSession(requests.ConnectionError('reset'))
+    assert client(session).sign_in_with_password({}).status_code == 200
+    assert session.posts == 2
+
+
+def test_sign_up_is_not_retried_once_the_request_may_have_been_sent():
+    session = FakeSession(requests.ConnectionError('reset'))
+    identity = client(session)
+    with pytest.raises(requests.ConnectionError):
+        identity.sign_up({})
+    assert session.posts == 1
+    assert identity.stats()['accounts:signUp']['errors'] == 1
+
+
+def test_sign_up_retries_connect_timeouts():
+    session = FakeSession(requests.ConnectTimeout('connect'))
+    identity = client(session)
+    assert identity.sign_up({}).status_code == 200
+    assert identity.stats()['accounts:signUp']['retries'] == 1
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from store.service.jobs import JobQueueFullError, JobRunner
+
+
+def test_job_succeeds_with_result_and_progress():
+    runner = JobRunner(max_workers=1)
+
+    def work(job, n):
+        job.report(n, n)
+        return {'rows': n}
+
+    job = runner.submit('test', work, 3, params={'n': 3})
+    assert job.wait(5)
+    assert job.status == 'succeeded'
+    assert job.result == {'rows': 3}
+    assert job.to_dict()['progress'] == {'done': 3, 'total': 3}
+    assert runner.get(job.id) is job
+
+
+def test_failure_is_recorded():
+    runner = JobRunner(max_workers=1)
+    job = runner.submit('test', lambda job: 1 / 0)
+    job.wait(5)
+    assert job.status == 'failed'
+    assert 'division' in job.error
+    assert runner.stats()['failed'] == 1
+
+
+def test_cancel_running_and_queued_jobs():
+    runner = JobRunner(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def chunks(job):
+        started.set()
+        # Bounded, so a cancel that never lands fails the test instead of hanging it
+        for _ in range(500):
+            job.check_cancelled()
+            release.wait(0.01)
+
+    running = runner.submit('test', chunks)
+    started.wait(5)
+    queued = runner.submit('test', lambda job: 'never')
+    runner.cancel(queued.id)
+    runner.cancel(running.id)
+    assert running.wait(5) and queued.wait(5)
+    assert (running.status, queued.status) == ('cancelled', 'cancelled')
+    assert queued.result is None
+
+
+def test_submit_rejects_beyond_workers_plus_pending():
+    runner = JobRunner(max_workers=1, max_pending=1)
+    release = threading.Event()
+    jobs = [runner.submit('test', lambda job: release.wait(5)) for _ in range(2)]
+    with pytest.raises(JobQueueFullError):
+        runner.submit('test', lambda job: None)
+    release.set()
+    for job in jobs:
+        job.wait(5)
+    assert runner.stats()['rejected'] == 1
+
+
+def test_finished_jobs_are_pruned_to_keep():
+    runner = JobRunner(max_workers=1, keep=2)
+    jobs = []
+    for _ in range(4):
+        jobs.append(runner.submit('test', lambda job: None))
+        jobs[-1].wait(5)
+    assert [job.id for job in runner.list()][-2:] == [job.id for job in jobs[-2:]]
+    assert runner.get(jobs[0].id) is None
@@ -0,0 +1,51 @@
+from store.metrics import Registry
+
+
+def test_counter_and_gauge_render_with_escaped_labels():
+    registry = Registry()
+    requests = registry.counter('http_requests_total', 'Requests', ('endpoint', 'status'))
+    requests.inc('users', '200')
+    requests.inc('users', '200', amount=2)
+    requests.inc('say "hi"\n', '500')
+    inflight = registry.gauge('http_in_flight', 'In flight')
+    inflight.inc()
+    inflight.dec()
+    inflight.set(4)
+
+    assert registry.render().splitlines() == [
+        '# HELP http_requests_total Requests',
+        '# TYPE http_requests_total counter',
+        'http_requests_total{endpoint="users",status="200"} 3',
+        'http_requests_total{endpoint="say \\"hi\\"\\n",status="500"} 1',
+        '# HELP http_in_flight In flight',
+        '# TYPE http_in_flight gauge',
+        'http_in_flight 4',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram('query_seconds', 'Query time', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, 'get')
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'query_seconds_bucket{op="get",le="0.1"} 2',
+        'query_seconds_bucket{op="get",le="1.0"} 3',
+        'query_seconds_bucket{op="get",le="+Inf"} 4',
+        'query_seconds_sum{op="get"} 3.65',
+        'query_seconds_count{op="get"} 4',
+    ]
+
+
+def test_collectors_skip_bools_and_missing_stats():
+    registry = Registry()
+    registry.register_collector('cache', lambda: {'hits': 3, 'enabled': True, 'name': 'users'}, 'User cache')
+    registry.register_collector('identity', lambda: None)
+
+    assert registry.render() == (
+        '# HELP cache_hits User cache: hits\n'
+        '# TYPE cache_hits gauge\n'
+        'cache_hits 3\n'
+    )
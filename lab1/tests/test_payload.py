@@ -0,0 +1,57 @@
+import pytest
+from flask import Flask
+
+from store.controller.payload import bulk_response, iter_records, read_records
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_iter_records_parses_csv_line_by_line(app):
+    body = '﻿user_name,course_title\n ann ,sql\nbob,"a,b"\n'.encode()
+    with app.test_request_context(data=body, content_type='text/csv'):
+        assert list(iter_records()) == [
+            (0, {'user_name': 'ann', 'course_title': 'sql'}, None),
+            (1, {'user_name': 'bob', 'course_title': 'a,b'}, None),
+        ]
+
+
+def test_iter_records_ndjson_skips_blank_lines_and_reports_bad_ones(app):
+    body = b'{"a": 1}\n\n{bad\n{"a": 2}\n'
+    with app.test_request_context(data=body, content_type='application/x-ndjson'):
+        records = list(iter_records())
+    assert [(index, record) for index, record, _ in records] == [(0, {'a': 1}), (1, None), (2, {'a': 2})]
+    assert records[1][2].startswith('Invalid JSON')
+
+
+def test_iter_records_accepts_a_json_array(app):
+    with app.test_request_context(json=[{'a': 1}]):
+        assert list(iter_records()) == [(0, {'a': 1}, None)]
+
+
+def test_read_records_json_array(app):
+    with app.test_request_context(json=[{'a': 1}, 2]):
+        assert read_records() == ([(0, {'a': 1}), (1, 2)], [])
+
+
+def test_read_records_ndjson_reports_bad_lines(app):
+    with app.test_request_context(data=b'{"a": 1}\n\nnope\n', content_type='application/x-ndjson'):
+        records, errors = read_records()
+    assert records == [(0, {'a': 1})]
+    assert [index for index, _ in errors] == [1]
+
+
+def test_read_records_rejects_other_bodies(app):
+    with app.test_request_context(json={'a': 1}):
+        with pytest.raises(ValueError):
+            read_records()
+
+
+def test_bulk_response_status():
+    assert bulk_response(2, [])[1] == 201
+    body, status = bulk_response(1, [(3, 'bad'), (0, 'worse')])
+    assert status == 207
+    assert [error['index'] for error in body['errors']] == [0, 3]
+    assert bulk_response(0, [(0, 'bad')])[1] == 400
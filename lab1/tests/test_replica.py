@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from mysql.connector import errorcode, errors
+
+from store.db.connection import Replica
+
+
+class FakeCursor:
+    """Answers SHOW ... STATUS with the queued outcome for each statement."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.executed = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        outcome = self.outcomes[sql]
+        if isinstance(outcome, Exception):
+            raise outcome
+        self.row = outcome
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cur):
+        self.cur = cur
+
+    def cursor(self, dictionary=False):
+        return self.cur
+
+
+def make_replica(outcomes):
+    replica = Replica(0, 'replica-host', None, 1, max_lag=5, check_interval=5, connect_timeout=3)
+    cur = FakeCursor(outcomes)
+    replica.pool.acquire = lambda: FakeConnection(cur)
+    replica.pool.release = lambda conn: None
+    return replica, cur
+
+
+def denied():
+    return errors.ProgrammingError(msg='Access denied', errno=errorcode.ER_SPECIFIC_ACCESS_DENIED_ERROR)
+
+
+def test_missing_replication_client_grant_warns_once(caplog):
+    replica, cur = make_replica({'SHOW REPLICA STATUS': denied()})
+    with caplog.at_level(logging.WARNING):
+        for _ in range(3):
+            replica.check()
+    assert not replica.usable()
+    assert 'REPLICATION CLIENT' in replica.error
+    assert len(caplog.records) == 1
+    # Access denied is not taken for old syntax
+    assert cur.executed == ['SHOW REPLICA STATUS'] * 3
+
+
+def test_old_servers_fall_back_to_slave_status():
+    replica, cur = make_replica({
+        'SHOW REPLICA STATUS': errors.ProgrammingError(msg='syntax', errno=errorcode.ER_PARSE_ERROR),
+        'SHOW SLAVE STATUS': {'Seconds_Behind_Master': 2},
+    })
+    replica.check()
+    assert replica.usable() and replica.lag == 2
+
+
+@pytest.mark.parametrize('lag, usable', [(5, True), (6, False), (None, False)])
+def test_lag_limit(lag, usable):
+    replica, _ = make_replica({'SHOW REPLICA STATUS': {'Seconds_Behind_Source': lag}})
+    replica.check()
+    assert replica.usable() is usable
@@ -0,0 +1,21 @@
+import pytest
+from flask import Flask, Response, jsonify
+
+from store.controller.response import json_response
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_json_response_matches_jsonify_and_takes_headers(app, debug):
+    app.debug = debug
+    data = [{'name': 'ann', 'id': 1}, {'name': 'bob', 'id': 2}]
+    with app.test_request_context():
+        response = json_response(data, 201)
+        assert isinstance(response, Response)
+        assert response.status_code == 201
+        assert response.get_data() == jsonify(data).get_data()
+        response.headers['X-Next-After'] = '2'
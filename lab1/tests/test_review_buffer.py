@@ -0,0 +1,98 @@
+import pytest
+
+from store.dto.review import ReviewDTO
+from store.service.review_buffer import BufferClosedError, BufferFullError, ReviewWriteBuffer
+
+
+class FakeReviewDAO:
+    """Records each batch; reviews rated 0 are rejected like the procedure would."""
+
+    def __init__(self):
+        self.batches = []
+
+    def insert_reviews(self, reviews):
+        self.batches.append(list(reviews))
+        return {index: ValueError('bad rating') for index, review in enumerate(reviews) if review.rating == 0}
+
+
+def test_batch_commits_and_reports_rejected_reviews():
+    dao = FakeReviewDAO()
+    buffer = ReviewWriteBuffer(dao, batch_size=10, max_delay=0.05)
+    good = buffer.submit(ReviewDTO(1, 1, 5, 'ok'))
+    bad = buffer.submit(ReviewDTO(1, 2, 0, 'bad'))
+    assert good.result(5) is True
+    with pytest.raises(ValueError):
+        bad.result(5)
+    buffer.close(timeout=5)
+    assert sum(len(batch) for batch in dao.batches) == 2
+    stats = buffer.stats()
+    assert (stats['committed'], stats['failed']) == (1, 1)
+
+
+def test_close_flushes_pending_and_rejects_later_submits():
+    dao = FakeReviewDAO()
+    buffer = ReviewWriteBuffer(dao, batch_size=100, max_delay=10)
+    pending = buffer.submit(ReviewDTO(1, 1, 4, 'queued'))
+    buffer.close(timeout=5)
+    assert pending.result(0) is True
+    with pytest.raises(BufferClosedError):
+        buffer.submit(ReviewDTO(1, 1, 4, 'too late'))
+    assert buffer.stats()['closed'] is True
+
+
+def test_full_queue_is_rejected():
+    buffer = ReviewWriteBuffer(FakeReviewDAO(), max_queue=1, max_delay=10)
+    # Without a running flusher nothing drains the queue
+    buffer._ensure_started = lambda: None
+    buffer.submit(ReviewDTO(1, 1, 4, 'first'))
+    with pytest.raises(BufferFullError):
+        buffer.submit(ReviewDTO(1, 1, 4, 'second'))
+
+
+def test_cancelled_review_is_withdrawn_before_its_batch():
+    dao = FakeReviewDAO()
+    buffer = ReviewWriteBuffer(dao, max_delay=10)
+    buffer._ensure_started = lambda: None
+    withdrawn = buffer.submit(ReviewDTO(1, 1, 4, 'timed out'))
+    kept = buffer.submit(ReviewDTO(1, 2, 5, 'kept'))
+    assert withdrawn.cancel()
+    buffer._flush([buffer._queue.get_nowait() for _ in range(2)])
+    assert [review.comment for batch in dao.batches for review in batch] == ['kept']
+    assert kept.result(0) is True
+    # Once its batch has been written the review can no longer be withdrawn
+    assert not kept.cancel()
+    assert (buffer.stats()['withdrawn'], buffer.stats()['committed']) == (1, 1)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from flask import Flask
+    from store.controller import review
+
+    buffer = ReviewWriteBuffer(FakeReviewDAO(), max_delay=10)
+    # Nothing flushes, so every review stays queued
+    buffer._ensure_started = lambda: None
+    monkeypatch.setattr(review, 'review_buffer', buffer)
+    monkeypatch.setattr(review, 'REVIEW_COMMIT_TIMEOUT', 0.01)
+    app = Flask(__name__)
+    app.register_blueprint(review.review_bp)
+    return app.test_client(), buffer
+
+
+REVIEW = {'course_id': 1, 'user_id': 1, 'rating': 5, 'comment': 'ok'}
+
+
+def test_enqueue_ack_is_opt_in(client):
+    client, buffer = client
+    response = client.post('/reviews?wait=0', json=REVIEW)
+    assert response.status_code == 202
+    assert buffer.stats()['queue_depth'] == 1
+
+
+def test_commit_timeout_withdraws_the_review(client):
+    client, buffer = client
+    response = client.post('/reviews', json=REVIEW)
+    assert response.status_code == 504
+    assert 'withdrawn' in response.json['error']
+    item = buffer._queue.get_nowait()
+    assert item[1].cancelled()
@@ -0,0 +1,37 @@
+import json
+from datetime import date
+
+from flask import Flask, jsonify
+
+from store.dto.enrollment_dto import EnrollmentDTO
+from store.dto.row_mapper import RowMapper, json_date
+
+
+def test_keys_are_sorted_and_taken_by_column():
+    mapper = RowMapper({'name': 1, 'id': 0, 'email': 2})
+    assert mapper.keys == ('email', 'id', 'name')
+    item = mapper.one((7, 'ann', 'a@x'))
+    assert list(item) == ['email', 'id', 'name']
+    assert item == {'id': 7, 'name': 'ann', 'email': 'a@x'}
+
+
+def test_single_column_mapper():
+    assert RowMapper({'id': 0}).many([(1,), (2,)]) == [{'id': 1}, {'id': 2}]
+
+
+def test_one_many_and_iter_agree_and_apply_converters():
+    mapper = RowMapper({'id': 0, 'title': 1}, converters={'title': str.upper})
+    rows = [(1, 'a'), (2, 'b')]
+    assert mapper.many(rows) == list(mapper.iter(rows)) == [mapper.one(row) for row in rows]
+    assert mapper.one((1, 'a')) == {'id': 1, 'title': 'A'}
+
+
+def test_presorted_output_matches_jsonify():
+    app = Flask(__name__)
+    rows = [(1, 'ann', 'python', date(2024, 9, 1), 'done'), (2, 'bob', 'sql', None, 'active')]
+    legacy = [EnrollmentDTO(*row).to_dict() for row in rows]
+    with app.test_request_context():
+        expected = jsonify(legacy).get_data()
+    compact = json.dumps(EnrollmentDTO.ROW.many(rows), separators=(',', ':')) + '\n'
+    assert compact.encode() == expected
+    assert json_date(None) is None
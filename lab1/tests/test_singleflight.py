@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from store.service.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call(wait_until):
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return 'rows'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('k', load))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Every caller has joined once the followers are counted
+    wait_until(lambda: flight.stats()['followers'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {result for result, _ in results} == {'rows'}
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'followers': 4}
+
+
+def test_sequential_calls_do_not_share():
+    flight = SingleFlight()
+    assert flight.do('k', lambda: 1) == (1, False)
+    assert flight.do('k', lambda: 2) == (2, False)
+
+
+def test_error_reaches_followers_and_clears_the_key(wait_until):
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('db down')
+
+    def call():
+        try:
+            flight.do('k', fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_until(lambda: flight.stats()['followers'] == 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert errors == ['db down', 'db down']
+    with pytest.raises(KeyError):
+        flight.do('k', lambda: {}['missing'])
+    assert flight.stats()['in_flight'] == 0
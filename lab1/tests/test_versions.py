@@ -0,0 +1,24 @@
+from store.dao.versions import TableVersions
+
+
+def test_etag_changes_only_for_bumped_tables():
+    versions = TableVersions(ttl=0)
+    users, courses = versions.etag('users'), versions.etag('courses')
+    versions.bump('users')
+    assert versions.etag('users') != users
+    assert versions.etag('courses') == courses
+    assert versions.stats() == {'users': 1}
+
+
+def test_etag_rolls_over_with_ttl(clock):
+    versions = TableVersions(ttl=30, clock=clock)
+    tag = versions.etag('users')
+    clock.now = 29
+    assert versions.etag('users') == tag
+    clock.now = 30
+    assert versions.etag('users') != tag
+
+
+def test_epoch_differs_between_instances():
+    # Stands in for two worker processes: neither accepts the other's tags
+    assert TableVersions(ttl=0).etag('users') != TableVersions(ttl=0).etag('users')